@@ -0,0 +1,94 @@
+import os
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Runtime settings, overridable through environment variables.
+# Relative paths are resolved against the backend project root.
+
+# Directory holding the mock_*.json data files
+DATA_DIR = os.getenv("CORETERRA_DATA_DIR", "data")
+
+# Storage engine behind DataService: "json" or "sqlite"
+STORAGE_BACKEND = os.getenv("CORETERRA_STORAGE_BACKEND", "json")
+SQLITE_PATH = os.getenv("CORETERRA_SQLITE_PATH", "data/coreterra.sqlite3")
+
+# Write-behind persistence for the JSON engine: mutations only mark files dirty and a
+# background thread flushes them every FLUSH_INTERVAL_MS or once FLUSH_MAX_DIRTY
+# mutations are pending. Pending writes are flushed on shutdown.
+WRITE_BEHIND = _env_bool("CORETERRA_WRITE_BEHIND")
+FLUSH_INTERVAL_MS = int(os.getenv("CORETERRA_FLUSH_INTERVAL_MS", "1000"))
+FLUSH_MAX_DIRTY = int(os.getenv("CORETERRA_FLUSH_MAX_DIRTY", "100"))
+
+# Journal mode for the JSON engine: each mutation is appended to <file>.journal and
+# replayed on startup; the journal is folded back into the snapshot file once it
+# grows past JOURNAL_MAX_BYTES.
+JOURNAL = _env_bool("CORETERRA_JOURNAL")
+JOURNAL_MAX_BYTES = int(os.getenv("CORETERRA_JOURNAL_MAX_BYTES", str(1024 * 1024)))
+
+# When the JSON engine checks data files for outside changes: "always" (stat on every
+# read), "ttl" (at most every RELOAD_TTL_MS), "inotify" (watcher thread, polling every
+# RELOAD_TTL_MS where inotify is unavailable) or "never" (recommended in production)
+RELOAD_POLICY = os.getenv("CORETERRA_RELOAD_POLICY", "always")
+RELOAD_TTL_MS = int(os.getenv("CORETERRA_RELOAD_TTL_MS", "1000"))
+
+# Multi-process mode, for running several worker processes (uvicorn --workers N) over
+# the same data: writes take a lock file shared by the workers, and a memory-mapped
+# change sequence tells the other workers which collections to reload (replacing
+# RELOAD_POLICY). Needs WRITE_BEHIND and JOURNAL off.
+MULTIPROCESS = _env_bool("CORETERRA_MULTIPROCESS")
+
+# On-disk format of the JSON engine's data files: "json" (pretty-printed, default),
+# "compact" (mock_*.compact.json, no indentation, orjson when installed) or "msgpack"
+# (mock_*.msgpack, needs the snapshot extra). Files are converted on their next save,
+# or up front with python -m app.services.storage.convert. SNAPSHOT_LAZY
+# memory-maps msgpack snapshots and decodes each collection on first access.
+SNAPSHOT_FORMAT = os.getenv("CORETERRA_SNAPSHOT_FORMAT", "json")
+SNAPSHOT_LAZY = _env_bool("CORETERRA_SNAPSHOT_LAZY")
+
+# Threads running the blocking part of DataService's async API (aget_all, acreate, ...):
+# reloads from disk, JSON encoding and file writes, kept off the event loop
+STORAGE_IO_WORKERS = int(os.getenv("CORETERRA_STORAGE_IO_WORKERS", "8"))
+
+# Serve list endpoints straight from the store with orjson (or a precompiled pydantic
+# TypeAdapter), skipping response_model validation of data validated on write
+FAST_RESPONSES = _env_bool("CORETERRA_FAST_RESPONSES")
+
+# Verified JWT payloads kept in memory by token digest: at most TOKEN_CACHE_SIZE
+# tokens, each for TOKEN_CACHE_TTL_S seconds or until its exp claim (0 disables either)
+TOKEN_CACHE_SIZE = int(os.getenv("CORETERRA_TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_TTL_S = int(os.getenv("CORETERRA_TOKEN_CACHE_TTL_S", "300"))
+
+# bcrypt hashing/verification runs in a pool of PASSWORD_WORKERS threads; logins beyond
+# PASSWORD_QUEUE waiting jobs are rejected with 503 instead of piling up
+PASSWORD_WORKERS = int(os.getenv("CORETERRA_PASSWORD_WORKERS", "2"))
+PASSWORD_QUEUE = int(os.getenv("CORETERRA_PASSWORD_QUEUE", "32"))
+
+# The analytics endpoints aggregate a columnar snapshot of the tasks that is rebuilt
+# at most every ANALYTICS_CACHE_TTL_S seconds
+ANALYTICS_CACHE_TTL_S = int(os.getenv("CORETERRA_ANALYTICS_CACHE_TTL_S", "60"))
+
+# Change feed (/api/events): events buffered per connection before it is told to resync
+EVENT_QUEUE_SIZE = int(os.getenv("CORETERRA_EVENT_QUEUE_SIZE", "100"))
+
+# Per-request sampling profiler: when enabled, a request sent with "X-Profile: 1" has the
+# stacks of the event loop thread and the busy storage I/O threads sampled every
+# PROFILE_INTERVAL_MS and the folded stacks (flamegraph.pl / speedscope input, rooted at
+# the thread name) written to PROFILE_DIR; the response's X-Profile header names the file.
+# Concurrent requests on the same loop and pool show up in each other's profile.
+PROFILING = _env_bool("CORETERRA_PROFILING")
+PROFILE_INTERVAL_MS = float(os.getenv("CORETERRA_PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("CORETERRA_PROFILE_DIR", "profiles")
+
+# Sharding: "none" keeps every collection in the shared store; "user" or "team" (the
+# user's teamId, else the user) keeps tasks, calendar events and reports per owner in
+# SHARD_DIR/<key>/, loaded on first use. At most SHARD_MAX_OPEN shards stay open;
+# the least recently used ones beyond that are flushed and closed.
+SHARD_BY = os.getenv("CORETERRA_SHARD_BY", "none")
+SHARD_DIR = os.getenv("CORETERRA_SHARD_DIR", "data/shards")
+SHARD_MAX_OPEN = int(os.getenv("CORETERRA_SHARD_MAX_OPEN", "64"))
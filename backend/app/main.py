@@ -1,11 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, tasks, projects, users, gamification, teams, contexts, reports
+from fastapi.responses import PlainTextResponse
+from app.middleware.metrics import MetricsMiddleware
+from app.routers import auth, tasks, projects, users, gamification, teams, contexts, reports, events
+from app.services.data_service import data_service
+from app.services import metrics, project_stats, report_engine
+from app.services.shards import shard_manager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the materialized project counters in line with the tasks on disk. Shards are
+    # opened on first use and build their own rollups then; their project counters are
+    # rebuilt on demand (python -m app.services.shards rebuild-projects)
+    if not shard_manager.enabled:
+        project_stats.rebuild()
+        report_engine.ensure_rollups()
+    yield
+    # Persist pending write-behind changes before the process exits
+    shard_manager.close()
+    data_service.close()
+
 
 app = FastAPI(
     title="Coreterra API",
     description="Coreterra MVP Backend API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -20,8 +42,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile"],
 )
 
+# Per-route latency histograms (served at /metrics); added last so it times the whole stack
+app.add_middleware(MetricsMiddleware)
+
 # Register routers
 app.include_router(auth.router)
 app.include_router(tasks.router)
@@ -31,6 +57,7 @@ app.include_router(gamification.router)
 app.include_router(teams.router)
 app.include_router(contexts.router)
 app.include_router(reports.router)
+app.include_router(events.router)
 
 
 @app.get("/")
@@ -42,3 +69,9 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,14 +1,33 @@
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Query, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from app.services.auth_service import decode_access_token
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Get current authenticated user from JWT token"""
-    token = credentials.credentials
+    return _user_from_token(credentials.credentials)
+
+
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    access_token: Optional[str] = Query(None, description="JWT for clients that cannot set headers (EventSource)"),
+) -> dict:
+    """Get the current user from the Authorization header or the access_token query parameter"""
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _user_from_token(token)
+
+
+def _user_from_token(token: str) -> dict:
     payload = decode_access_token(token)
     if payload is None:
         raise HTTPException(
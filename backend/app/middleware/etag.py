@@ -0,0 +1,22 @@
+from fastapi import Depends, HTTPException, Request, Response, status
+from app.middleware.store import get_user_store
+from app.services.data_service import DataService
+
+
+class CollectionETag:
+    """Dependency for list endpoints: sets an ETag from collection versions and
+    answers a matching If-None-Match with 304 before the data is read"""
+
+    def __init__(self, *collections: str):
+        self.collections = collections
+
+    async def __call__(self, request: Request, response: Response, store: DataService = Depends(get_user_store)) -> str:
+        etag = await store.aetag(*self.collections)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidates = {tag.strip() for tag in if_none_match.split(",")}
+            # Weak comparison: W/"x" and "x" match
+            if "*" in candidates or etag in candidates or etag[2:] in candidates:
+                raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return etag
@@ -0,0 +1,95 @@
+import itertools
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app import config
+from app.services import metrics
+from app.services.data_service import IO_THREAD_PREFIX
+from app.services.profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+_profile_sequence = itertools.count(1)
+
+
+def _profile_dir() -> Path:
+    # Relative to the backend project root, like DATA_DIR
+    return Path(__file__).parent.parent.parent / config.PROFILE_DIR
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request latency, and profiling
+    single requests that ask for it with an X-Profile header (if enabled)"""
+
+    def __init__(self, app):
+        self.app = app
+        # endpoint function -> route path template, built on first use
+        self._route_paths: Optional[Dict[Callable, str]] = None
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        """Path template of the matched route; never the raw path, to bound label values"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._route_paths = {route.endpoint: route.path for route in routes if hasattr(route, "endpoint")}
+        return self._route_paths.get(endpoint, "unmatched")
+
+    @staticmethod
+    def _wants_profile(scope: Dict[str, Any]) -> bool:
+        if not config.PROFILING:
+            return False
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return value.strip().lower() in (b"1", b"true", b"yes", b"on")
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        profile_name = None
+        if self._wants_profile(scope):
+            profile_name = f"profile-{int(time.time() * 1000)}-{next(_profile_sequence)}.folded"
+            # The storage work of the request runs on the I/O pool, so sample its threads too
+            profiler = SamplingProfiler(
+                threading.get_ident(), config.PROFILE_INTERVAL_MS / 1000, thread_prefixes=(IO_THREAD_PREFIX,)
+            ).start()
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_name is not None:
+                    message["headers"] = [*message.get("headers", []), (b"x-profile", profile_name.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.REQUEST_LATENCY.observe(
+                elapsed, method=scope["method"], route=self._route(scope), status=status_code
+            )
+            if profiler is not None:
+                profiler.stop()
+                self._write_profile(profile_name, profiler)
+
+    @staticmethod
+    def _write_profile(name: str, profiler: SamplingProfiler):
+        try:
+            profile_dir = _profile_dir()
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            (profile_dir / name).write_text(profiler.folded(), encoding="utf-8")
+        except OSError:
+            logger.exception("Failed to write profile %s", name)
@@ -0,0 +1,50 @@
+from fastapi import HTTPException, Query, Response, status
+from typing import Any, List, Optional
+from app.responses import fast_response, store_response
+from app.services.data_service import DataService, data_service, InvalidCursorError
+
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; items are ordered by id"),
+        cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields: Optional[List[str]] = (
+            [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        )
+
+
+async def paginate(
+    collection: str,
+    params: PageParams,
+    response: Response,
+    service: DataService = data_service,
+    **filters: Any,
+):
+    """Read one page of a collection (from service, e.g. the user's shard) for a list endpoint.
+
+    The next page's cursor is returned in the X-Next-Cursor header. Projected
+    items no longer match the endpoint's response model, so they are always
+    sent directly; full items are too in fast response mode.
+    """
+    try:
+        items, next_cursor = await service.apage(
+            collection, limit=params.limit, cursor=params.cursor, fields=params.fields, **filters
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if params.fields:
+        return fast_response(items, response)
+    return store_response(items, response)
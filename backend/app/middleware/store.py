@@ -0,0 +1,12 @@
+from fastapi import Depends
+from app.middleware.auth import get_current_user
+from app.services.data_service import DataService
+from app.services.shards import shard_manager
+
+
+async def get_user_store(current_user: dict = Depends(get_current_user)) -> DataService:
+    """Get the DataService holding the current user's data: their shard when sharding is on"""
+    if not shard_manager.enabled:
+        return shard_manager.root
+    # Opening a shard reads its files from disk
+    return await shard_manager.root.arun(shard_manager.for_user, current_user)
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 
 
@@ -35,6 +35,7 @@ class Task(BaseModel):
     contextId: Optional[str] = None
     difficulty: Optional[Difficulty] = None
     estimatedTime: Optional[str] = None
+    actualTime: Optional[str] = None
     xpReward: int = 0
     goldReward: Optional[int] = None
     subtasks: Optional[List[Subtask]] = None
@@ -42,6 +43,8 @@ class Task(BaseModel):
     assigneeId: Optional[int] = None
     description: Optional[str] = None
     dueDate: Optional[str] = None
+    completedAt: Optional[str] = None
+    completedBy: Optional[int] = None
 
 
 class TaskCreate(BaseModel):
@@ -49,6 +52,8 @@ class TaskCreate(BaseModel):
     status: TaskStatus = TaskStatus.inbox
     priority: bool = False
     description: Optional[str] = None
+    difficulty: Optional[Difficulty] = None
+    estimatedTime: Optional[str] = None
 
 
 class TaskUpdate(BaseModel):
@@ -59,6 +64,7 @@ class TaskUpdate(BaseModel):
     contextId: Optional[str] = None
     difficulty: Optional[Difficulty] = None
     estimatedTime: Optional[str] = None
+    actualTime: Optional[str] = None
     xpReward: Optional[int] = None
     goldReward: Optional[int] = None
     subtasks: Optional[List[Subtask]] = None
@@ -67,3 +73,16 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = None
     dueDate: Optional[str] = None
 
+
+# Upper bound on the items of one bulk request
+MAX_BULK_ITEMS = 1000
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBulkRequest(BaseModel):
+    create: List[TaskCreate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    update: List[TaskBulkUpdate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
@@ -0,0 +1,47 @@
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app import config
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see pyproject extras
+    orjson = None
+
+# Precompiled serializer used when orjson is not installed
+_any_adapter = TypeAdapter(Any)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize store data to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return _any_adapter.dump_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that serializes trusted store dicts directly to bytes"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Send content through FastJSONResponse, keeping headers set on the route's response"""
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content=content, headers=headers)
+
+
+def store_response(content: Any, response: Optional[Response] = None):
+    """Return store data from a route.
+
+    In fast mode (CORETERRA_FAST_RESPONSES) the data is sent as-is through
+    FastJSONResponse, so FastAPI skips response_model validation and
+    jsonable_encoder; items are not filled with model defaults. Otherwise
+    the content is returned for FastAPI to validate as usual. Headers set on
+    the route's response are kept either way.
+    """
+    if config.FAST_RESPONSES:
+        return fast_response(content, response)
+    return content
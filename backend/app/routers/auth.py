@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
-from app.services.auth_service import authenticate_user, create_access_token
+from app.services.auth_service import PasswordPoolBusy, authenticate_user, create_access_token
 from app.middleware.auth import get_current_user
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -20,7 +20,14 @@ class LoginResponse(BaseModel):
 @router.post("/login", response_model=LoginResponse)
 async def login(credentials: LoginRequest):
     """Authenticate user and return JWT token"""
-    user = authenticate_user(credentials.username, credentials.password)
+    try:
+        user = await authenticate_user(credentials.username, credentials.password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
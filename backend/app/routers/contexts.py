@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from typing import List
 from app.services.data_service import data_service
 from app.middleware.auth import get_current_user
+from app.middleware.etag import CollectionETag
+from app.responses import store_response
 
 router = APIRouter(prefix="/api/contexts", tags=["contexts"])
 
 
 @router.get("")
-async def get_contexts(current_user: dict = Depends(get_current_user)):
+async def get_contexts(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(CollectionETag("contexts"))
+):
     """Get all contexts"""
-    return data_service.get_all("contexts")
+    return store_response(await data_service.aget_all("contexts"), response)
 
 
 @router.get("/scheduled/categories")
-async def get_scheduled_categories(current_user: dict = Depends(get_current_user)):
+async def get_scheduled_categories(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(CollectionETag("scheduledCategories"))
+):
     """Get all scheduled categories"""
-    return data_service.get_all("scheduledCategories")
+    return store_response(await data_service.aget_all("scheduledCategories"), response)
 
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.middleware.auth import get_stream_user
+from app.services.events import event_hub
+from app.services.shards import shard_manager
+from app.services.storage import COLLECTION_FILES
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_INTERVAL = 15
+
+# Collections that may be followed (credentials are never streamed)
+STREAMABLE_COLLECTIONS = sorted(set(COLLECTION_FILES) - {"authCredentials"})
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    collections: str = Query("tasks,users", description="Comma-separated collections to follow"),
+    current_user: dict = Depends(get_stream_user)
+):
+    """Stream create/update/delete events as server-sent events
+
+    Each event is named after the operation and carries
+    {"collection", "id", "item"}. Of users and reportRollups only the current
+    user's own records are streamed. A "resync" event means events were dropped
+    and the listed collections should be reloaded.
+    """
+    wanted = {name.strip() for name in collections.split(",") if name.strip()}
+    unknown = wanted - set(STREAMABLE_COLLECTIONS)
+    if not wanted or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown collections: {', '.join(sorted(unknown))}" if unknown else "No collections given",
+        )
+    # With sharding, changes to partitioned collections only reach subscribers of the same shard
+    shard = None
+    if shard_manager.enabled:
+        shard = await shard_manager.root.arun(shard_manager.key_for, current_user["user_id"])
+    subscription = event_hub.subscribe(wanted, current_user["user_id"], shard=shard)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=KEEPALIVE_INTERVAL)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {event['data']}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,46 +1,59 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List
 from app.models.gamification import ShopItem, Achievement
-from app.services.data_service import data_service
+from app.services.data_service import Transaction, data_service
 from app.middleware.auth import get_current_user
+from app.middleware.etag import CollectionETag
+from app.responses import store_response
 
 router = APIRouter(prefix="/api/gamification", tags=["gamification"])
 
 
 @router.get("/shop", response_model=List[ShopItem])
-async def get_shop_items(current_user: dict = Depends(get_current_user)):
+async def get_shop_items(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(CollectionETag("shopItems"))
+):
     """Get all shop items"""
-    return data_service.get_all("shopItems")
+    return store_response(await data_service.aget_all("shopItems"), response)
 
 
-@router.post("/shop/{item_id}/buy")
-async def buy_shop_item(item_id: str, current_user: dict = Depends(get_current_user)):
-    """Buy a shop item"""
-    item = data_service.get_by_id("shopItems", item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    user = data_service.get_by_id("users", current_user["user_id"])
+def _buy(tx: Transaction, user_id: int, item: dict):
+    # The gold check and the deduction happen under the users lock, so
+    # concurrent purchases cannot spend the same gold twice
+    user = tx.get("users", user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
+
     cost = item.get("cost", 0)
     if user.get("gold", 0) < cost:
         raise HTTPException(status_code=400, detail="Not enough gold")
-    
+
     # Deduct gold and add to inventory
-    user["gold"] = user.get("gold", 0) - cost
     inventory = user.get("inventory", [])
-    if item_id not in inventory:
-        inventory.append(item_id)
-    user["inventory"] = inventory
-    
-    data_service.update("users", current_user["user_id"], user)
+    if item["id"] not in inventory:
+        inventory.append(item["id"])
+    tx.update("users", user_id, {"gold": user.get("gold", 0) - cost, "inventory": inventory})
+
+
+@router.post("/shop/{item_id}/buy")
+async def buy_shop_item(item_id: str, current_user: dict = Depends(get_current_user)):
+    """Buy a shop item"""
+    item = await data_service.aget_by_id("shopItems", item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    await data_service.atransaction(("users",), _buy, current_user["user_id"], item)
     return {"message": "Purchase successful", "item": item}
 
 
 @router.get("/achievements", response_model=List[Achievement])
-async def get_achievements(current_user: dict = Depends(get_current_user)):
+async def get_achievements(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(CollectionETag("achievements"))
+):
     """Get all achievements"""
-    return data_service.get_all("achievements")
+    return store_response(await data_service.aget_all("achievements"), response)
 
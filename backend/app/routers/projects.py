@@ -1,22 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List
 from app.models.project import Project, ProjectCreate, ProjectUpdate
 from app.services.data_service import data_service
 from app.middleware.auth import get_current_user
+from app.middleware.etag import CollectionETag
+from app.middleware.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 
 @router.get("", response_model=List[Project])
-async def get_projects(current_user: dict = Depends(get_current_user)):
+async def get_projects(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(CollectionETag("projects"))
+):
     """Get all projects"""
-    return data_service.get_all("projects")
+    return await paginate("projects", page, response)
 
 
 @router.get("/{project_id}", response_model=Project)
 async def get_project(project_id: str, current_user: dict = Depends(get_current_user)):
     """Get a project by ID"""
-    project = data_service.get_by_id("projects", project_id)
+    project = await data_service.aget_by_id("projects", project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -33,9 +40,9 @@ async def create_project(
     project_dict["totalTasks"] = 0
     project_dict["completedTasks"] = 0
     # Generate ID
-    projects = data_service.get_all("projects")
+    projects = await data_service.aget_all("projects")
     project_dict["id"] = f"p{len(projects) + 1}"
-    created = data_service.create("projects", project_dict)
+    created = await data_service.acreate("projects", project_dict)
     return created
 
 
@@ -47,7 +54,7 @@ async def update_project(
 ):
     """Update a project"""
     update_dict = updates.dict(exclude_unset=True)
-    updated = data_service.update("projects", project_id, update_dict)
+    updated = await data_service.aupdate("projects", project_id, update_dict)
     if not updated:
         raise HTTPException(status_code=404, detail="Project not found")
     return updated
@@ -56,7 +63,7 @@ async def update_project(
 @router.delete("/{project_id}", status_code=204)
 async def delete_project(project_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a project"""
-    success = data_service.delete("projects", project_id)
+    success = await data_service.adelete("projects", project_id)
     if not success:
         raise HTTPException(status_code=404, detail="Project not found")
     return None
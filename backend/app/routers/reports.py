@@ -1,30 +1,157 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Optional
-from app.services.data_service import data_service
+from app.services.data_service import DataService
+from app.services import report_engine
+from app.services.analytics import AnalyticsUnavailable, TaskFrame, frame_cache_for
 from app.middleware.auth import get_current_user
+from app.middleware.etag import CollectionETag
+from app.middleware.pagination import PageParams, paginate
+from app.middleware.store import get_user_store
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
 
 @router.get("")
 async def get_reports(
+    response: Response,
     type: Optional[str] = Query(None, description="Filter by report type (daily, weekly, monthly)"),
-    current_user: dict = Depends(get_current_user)
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store),
+    etag: str = Depends(CollectionETag("reports"))
 ):
     """Get all reports, optionally filtered by type"""
-    reports = data_service.get_all("reports")
-    if type:
-        reports = [r for r in reports if r.get("type") == type]
-    return reports
+    return await paginate("reports", page, response, service=store, type=type)
+
+
+def _period_report(period: str, user_id: int, store: DataService) -> Optional[dict]:
+    """Build the current period's report from the user's precomputed rollup bucket"""
+    stats = report_engine.get_bucket(user_id, period, service=store)
+    if not stats["completedTasks"]:
+        # Nothing completed yet this period: fall back to the latest stored report
+        reports = store.query("reports", type=period)
+        return reports[-1] if reports else None
+
+    hours = stats["minutes"] / 60
+    return {
+        "id": stats["id"],
+        "type": period,
+        "title": f"{period.capitalize()} Insight",
+        "content": (
+            f"You completed <strong>{stats['completedTasks']} tasks</strong> and earned "
+            f"<strong>{stats['xpEarned']} XP</strong> ({hours:.1f}h of planned work)."
+        ),
+        "icon": "emoji_events",
+        "date": stats["start"],
+        "period": period.capitalize(),
+        "stats": stats,
+    }
 
 
 @router.get("/daily")
-async def get_daily_report(current_user: dict = Depends(get_current_user)):
-    """Get daily report"""
-    reports = data_service.get_all("reports")
-    daily_reports = [r for r in reports if r.get("type") == "daily"]
-    # Return the most recent daily report or the first one if none found
-    if daily_reports:
-        return daily_reports[-1] if daily_reports else daily_reports[0]
-    return None
+async def get_daily_report(
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get today's report"""
+    return await store.arun(_period_report, "daily", current_user["user_id"], store)
+
+
+@router.get("/weekly")
+async def get_weekly_report(
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get this week's report"""
+    return await store.arun(_period_report, "weekly", current_user["user_id"], store)
+
+
+@router.get("/monthly")
+async def get_monthly_report(
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get this month's report"""
+    return await store.arun(_period_report, "monthly", current_user["user_id"], store)
+
+
+@router.get("/rollups")
+async def get_rollups(
+    period: str = Query("daily", pattern="^(daily|weekly|monthly)$", description="Bucket size"),
+    limit: int = Query(30, ge=1, le=366, description="Number of most recent buckets"),
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get the current user's completion counts, XP and time by context/project per bucket, newest first"""
+    return await store.arun(report_engine.list_buckets, current_user["user_id"], period, limit, service=store)
+
+
+
+async def _analytics_frame(store: DataService) -> TaskFrame:
+    try:
+        # Rebuilding the snapshot reads every task
+        return await store.arun(frame_cache_for(store).get)
+    except AnalyticsUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
 
+
+def _analytics_user(scope: str, current_user: dict) -> Optional[int]:
+    return None if scope == "all" else current_user["user_id"]
+
+
+ScopeQuery = Query(
+    "me",
+    pattern="^(me|all)$",
+    description=(
+        "The current user's tasks (completed by, assigned to or owned by them, plus tasks naming no user)"
+        " or every task (of their shard when sharded)"
+    ),
+)
+
+
+@router.get("/analytics")
+async def get_analytics(
+    scope: str = ScopeQuery,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get task statistics: status counts, recent weekly throughput, time accuracy and XP distribution"""
+    frame = await _analytics_frame(store)
+    user_id = _analytics_user(scope, current_user)
+    return {
+        "statusCounts": frame.status_counts(user_id),
+        "throughput": frame.weekly_throughput(user_id, weeks=12),
+        "time": frame.time_accuracy(user_id),
+        "xp": frame.xp_distribution(user_id),
+    }
+
+
+@router.get("/analytics/throughput")
+async def get_throughput(
+    scope: str = ScopeQuery,
+    weeks: Optional[int] = Query(None, ge=1, description="Only the most recent weeks with completions"),
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get completed tasks per week"""
+    return (await _analytics_frame(store)).weekly_throughput(_analytics_user(scope, current_user), weeks=weeks)
+
+
+@router.get("/analytics/time")
+async def get_time_accuracy(
+    scope: str = ScopeQuery,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get estimated versus actual time"""
+    return (await _analytics_frame(store)).time_accuracy(_analytics_user(scope, current_user))
+
+
+@router.get("/analytics/xp")
+async def get_xp_distribution(
+    scope: str = ScopeQuery,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Get the XP distribution of completed tasks"""
+    return (await _analytics_frame(store)).xp_distribution(_analytics_user(scope, current_user))
@@ -1,102 +1,253 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
-from app.models.task import Task, TaskCreate, TaskUpdate, TaskStatus
-from app.services.data_service import data_service
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Any, List, Optional, Tuple
+from app.models.task import Task, TaskBulkRequest, TaskCreate, TaskUpdate, TaskStatus
+from app.services.data_service import DataService, InvalidCursorError, Transaction, decode_cursor, encode_cursor, project
+from app.services import project_stats, report_engine, rewards
+from app.services.search import index_for
 from app.middleware.auth import get_current_user
+from app.middleware.etag import CollectionETag
+from app.middleware.pagination import NEXT_CURSOR_HEADER, PageParams, paginate
+from app.middleware.store import get_user_store
+from app.responses import fast_response
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
 
 @router.get("", response_model=List[Task])
 async def get_tasks(
+    response: Response,
     status: Optional[TaskStatus] = None,
-    current_user: dict = Depends(get_current_user)
+    projectId: Optional[str] = None,
+    assigneeId: Optional[int] = None,
+    contextId: Optional[str] = None,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store),
+    etag: str = Depends(CollectionETag("tasks"))
 ):
-    """Get all tasks, optionally filtered by status"""
-    tasks = data_service.get_all("tasks")
-    if status:
-        tasks = [t for t in tasks if t.get("status") == status.value]
+    """Get all tasks, optionally filtered by status, project, assignee and context"""
+    return await paginate(
+        "tasks",
+        page,
+        response,
+        service=store,
+        status=status.value if status else None,
+        projectId=projectId,
+        assigneeId=assigneeId,
+        contextId=contextId,
+    )
+
+
+# Page size of search results when no limit is given
+SEARCH_PAGE_SIZE = 20
+
+
+def _search(store: DataService, q: str, offset: int, limit: int) -> Tuple[List[dict], bool]:
+    """One page of search results and whether more follow (builds the index on first use)"""
+    ranked = index_for(store).search(q)
+    tasks = []
+    for key, _ in ranked[offset:offset + limit]:
+        task = store.get_by_id("tasks", key)
+        if task is not None:
+            tasks.append(task)
+    return tasks, offset + limit < len(ranked)
+
+
+@router.get("/search", response_model=List[Task])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Words to find in titles, descriptions and subtasks"),
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Search tasks, best matches first (BM25; the last characters of a word may be omitted)"""
+    try:
+        offset = decode_cursor(page.cursor) if page.cursor else 0
+    except InvalidCursorError:
+        offset = None
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = page.limit or SEARCH_PAGE_SIZE
+
+    tasks, more = await store.arun(_search, store, q, offset, limit)
+    if more:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(offset + limit)
+    if page.fields:
+        return fast_response([project(task, page.fields) for task in tasks], response)
     return tasks
 
 
 @router.get("/{task_id}", response_model=Task)
-async def get_task(task_id: int, current_user: dict = Depends(get_current_user)):
+async def get_task(
+    task_id: int,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
     """Get a task by ID"""
-    task = data_service.get_by_id("tasks", task_id)
+    task = await store.aget_by_id("tasks", task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
+def _new_task_dicts(tasks: List[TaskCreate]) -> List[dict]:
+    """Build the stored form of new tasks, with rewards scored in one batch"""
+    now = datetime.utcnow().isoformat()
+    task_dicts = []
+    for task in tasks:
+        task_dict = task.dict()
+        task_dict["createdAt"] = task_dict.get("createdAt") or now
+        task_dicts.append(task_dict)
+    return rewards.assign(task_dicts)
+
+
+def _create_task(tx: Transaction, task_dict: dict) -> dict:
+    created = tx.create("tasks", task_dict)
+    project_stats.apply_task_change(tx, None, created)
+    return created
+
+
 @router.post("", response_model=Task, status_code=201)
 async def create_task(
     task: TaskCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
 ):
     """Create a new task"""
-    task_dict = task.dict()
-    task_dict["createdAt"] = task_dict.get("createdAt") or __import__("datetime").datetime.utcnow().isoformat()
-    task_dict["xpReward"] = 0
-    created = data_service.create("tasks", task_dict)
-    return created
+    return await store.atransaction(("tasks", "projects"), _create_task, _new_task_dicts([task])[0])
+
+
+@router.post("/bulk")
+async def bulk_tasks(
+    body: TaskBulkRequest,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Create, update and delete many tasks at once
+
+    All changes are applied in one transaction and written once. Results are
+    reported per item, in request order.
+    """
+    results = await store.abulk_write(
+        "tasks",
+        create=_new_task_dicts(body.create),
+        update=[(change.id, change.dict(exclude_unset=True, exclude={"id"})) for change in body.update],
+        delete=body.delete,
+        lock=("projects",),
+        on_change=project_stats.apply_task_change,
+        # Re-clarified tasks are scored against their stored difficulty and time, in one batch
+        prepare_updates=rewards.rescore_changes,
+    )
+    return {
+        "created": results["created"],
+        "updated": [
+            {"id": change.id, "ok": task is not None, "task": task}
+            for change, task in zip(body.update, results["updated"])
+        ],
+        "deleted": [
+            {"id": task_id, "ok": deleted}
+            for task_id, deleted in zip(body.delete, results["deleted"])
+        ],
+    }
+
+
+def _update_task(tx: Transaction, task_id: int, update_dict: dict) -> dict:
+    task = tx.get("tasks", task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    rewards.rescore_changes([(update_dict, task)])
+    updated = tx.update("tasks", task_id, update_dict)
+    project_stats.apply_task_change(tx, task, updated)
+    return updated
 
 
 @router.put("/{task_id}", response_model=Task)
 async def update_task(
     task_id: int,
     updates: TaskUpdate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
 ):
     """Update a task"""
     update_dict = updates.dict(exclude_unset=True)
-    updated = data_service.update("tasks", task_id, update_dict)
-    if not updated:
+    return await store.atransaction(("tasks", "projects"), _update_task, task_id, update_dict)
+
+
+def _delete_task(tx: Transaction, task_id: int):
+    task = tx.get("tasks", task_id)
+    if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return updated
+    tx.delete("tasks", task_id)
+    project_stats.apply_task_change(tx, task, None)
 
 
 @router.delete("/{task_id}", status_code=204)
-async def delete_task(task_id: int, current_user: dict = Depends(get_current_user)):
+async def delete_task(
+    task_id: int,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
     """Delete a task"""
-    success = data_service.delete("tasks", task_id)
-    if not success:
-        raise HTTPException(status_code=404, detail="Task not found")
+    await store.atransaction(("tasks", "projects"), _delete_task, task_id)
     return None
 
 
-@router.post("/{task_id}/complete", response_model=Task)
-async def complete_task(task_id: int, current_user: dict = Depends(get_current_user)):
-    """Mark a task as completed and award XP/gold"""
-    task = data_service.get_by_id("tasks", task_id)
+def _complete_task(tx: Transaction, task_id: int, user_id: Any) -> dict:
+    task = tx.get("tasks", task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Update task status
-    task["status"] = "completed"
-    
-    # Award XP and gold to user
-    user = data_service.get_by_id("users", current_user["user_id"])
+    # Completing twice (e.g. a retried request) must not pay out twice
+    if task.get("status") == "completed":
+        return task
+
+    # Award XP and gold to user; XP left over after a level-up carries into the next levels
+    xp_reward, gold_reward = rewards.completion_reward(task)
+    user = tx.get("users", user_id)
     if user:
-        xp_reward = task.get("xpReward", 50)
-        gold_reward = int(xp_reward * 0.5)
-        
-        user["currentXP"] = user.get("currentXP", 0) + xp_reward
+        user.update(rewards.add_xp(user, xp_reward))
         user["gold"] = user.get("gold", 0) + gold_reward
-        
-        # Check for level up
-        if user["currentXP"] >= user.get("maxXP", 500):
-            user["level"] = user.get("level", 1) + 1
-            user["currentXP"] = 0
-            user["maxXP"] = int(user.get("maxXP", 500) * 1.2)
-        
-        data_service.update("users", current_user["user_id"], user)
-    
-    updated = data_service.update("tasks", task_id, task)
+        tx.update("users", user_id, user)
+
+    # Update task status, recording the rewards actually paid out
+    completed_at = datetime.utcnow().isoformat()
+    updated = tx.update(
+        "tasks",
+        task_id,
+        {
+            "status": "completed",
+            "completedAt": completed_at,
+            "completedBy": user_id,
+            "xpReward": xp_reward,
+            "goldReward": gold_reward,
+        },
+    )
+    project_stats.apply_task_change(tx, task, updated)
+    report_engine.record_completion(tx, user_id, updated, xp_reward, completed_at)
     return updated
 
 
+@router.post("/{task_id}/complete", response_model=Task)
+async def complete_task(
+    task_id: int,
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store)
+):
+    """Mark a task as completed and award XP/gold"""
+    return await store.atransaction(
+        ("tasks", "users", "projects", "reportRollups"), _complete_task, task_id, current_user["user_id"]
+    )
+
+
 @router.get("/calendar/events")
-async def get_calendar_events(current_user: dict = Depends(get_current_user)):
+async def get_calendar_events(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    store: DataService = Depends(get_user_store),
+    etag: str = Depends(CollectionETag("calendarEvents"))
+):
     """Get all calendar events"""
-    return data_service.get_all("calendarEvents")
+    return await paginate("calendarEvents", page, response, service=store)
 
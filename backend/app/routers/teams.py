@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List
-from app.services.data_service import data_service
 from app.middleware.auth import get_current_user
+from app.middleware.etag import CollectionETag
+from app.middleware.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/api/teams", tags=["teams"])
 
 
 @router.get("")
-async def get_teams(current_user: dict = Depends(get_current_user)):
+async def get_teams(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(CollectionETag("teams"))
+):
     """Get all team members"""
-    return data_service.get_all("teams")
+    return await paginate("teams", page, response)
 
@@ -9,7 +9,7 @@ router = APIRouter(prefix="/api/users", tags=["users"])
 @router.get("/me", response_model=User)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current user information"""
-    user = data_service.get_by_id("users", current_user["user_id"])
+    user = await data_service.aget_by_id("users", current_user["user_id"])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -22,7 +22,7 @@ async def update_current_user(
 ):
     """Update current user information"""
     update_dict = updates.dict(exclude_unset=True)
-    updated = data_service.update("users", current_user["user_id"], update_dict)
+    updated = await data_service.aupdate("users", current_user["user_id"], update_dict)
     if not updated:
         raise HTTPException(status_code=404, detail="User not found")
     return updated
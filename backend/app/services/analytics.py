@@ -0,0 +1,216 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, see pyproject extras
+    np = None
+
+from app import config
+from app.models.task import Difficulty, TaskStatus
+from app.services.data_service import DataService, data_service
+from app.services.durations import parse_minutes
+
+# Integer codes for the categorical task fields; -1 means missing
+STATUS_CODES = {status.value: code for code, status in enumerate(TaskStatus)}
+DIFFICULTY_CODES = {difficulty.value: code for code, difficulty in enumerate(Difficulty)}
+
+# Weeks start on Monday; 1970-01-01 was a Thursday
+_WEEK_EPOCH = "1969-12-29"
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """Raised when numpy is not installed"""
+
+
+def _to_datetime64(values: List[Optional[str]]) -> "np.ndarray":
+    """Parse ISO timestamps (truncated to seconds, offsets dropped) into datetime64[s], NaT when missing"""
+    trimmed = [value[:19] if value else "NaT" for value in values]
+    try:
+        return np.array(trimmed, dtype="datetime64[s]")
+    except ValueError:
+        parsed = np.empty(len(trimmed), dtype="datetime64[s]")
+        for i, value in enumerate(trimmed):
+            try:
+                parsed[i] = np.datetime64(value, "s")
+            except ValueError:
+                parsed[i] = np.datetime64("NaT")
+        return parsed
+
+
+# Fields naming the user a task counts for, in order of precedence
+USER_FIELDS = ("completedBy", "assigneeId", "ownerId", "userId")
+
+
+def _task_user(task: Dict[str, Any]) -> Optional[Any]:
+    for field in USER_FIELDS:
+        if task.get(field) is not None:
+            return task[field]
+    return None
+
+
+class TaskFrame:
+    """Columnar copy of the tasks collection for vectorized aggregations
+
+    Categorical fields are integer codes (-1 when missing), timestamps are
+    datetime64[s] (NaT when missing) and durations are minutes (NaN when missing).
+    """
+
+    def __init__(self, tasks: Iterable[Dict[str, Any]]):
+        users, statuses, difficulties, contexts, xp = [], [], [], [], []
+        created, due, completed, estimated, actual = [], [], [], [], []
+        context_codes: Dict[str, int] = {}
+        minutes_cache: Dict[str, float] = {}
+
+        def minutes(value: Optional[str]) -> float:
+            if not value:
+                return float("nan")
+            if value not in minutes_cache:
+                minutes_cache[value] = float(parse_minutes(value) or "nan")
+            return minutes_cache[value]
+
+        for task in tasks:
+            user = _task_user(task)
+            users.append(user if isinstance(user, int) else -1)
+            statuses.append(STATUS_CODES.get(task.get("status"), -1))
+            difficulties.append(DIFFICULTY_CODES.get(task.get("difficulty"), -1))
+            context = task.get("contextId")
+            if context is None:
+                contexts.append(-1)
+            else:
+                contexts.append(context_codes.setdefault(str(context), len(context_codes)))
+            xp.append(task.get("xpReward") or 0)
+            created.append(task.get("createdAt"))
+            due.append(task.get("dueDate"))
+            completed.append(task.get("completedAt"))
+            estimated.append(minutes(task.get("estimatedTime")))
+            actual.append(minutes(task.get("actualTime")))
+
+        self.user = np.array(users, dtype=np.int64)
+        self.status = np.array(statuses, dtype=np.int8)
+        self.difficulty = np.array(difficulties, dtype=np.int8)
+        self.context = np.array(contexts, dtype=np.int32)
+        self.contexts = list(context_codes)
+        self.xp = np.array(xp, dtype=np.int64)
+        self.created_at = _to_datetime64(created)
+        self.due_date = _to_datetime64(due)
+        self.completed_at = _to_datetime64(completed)
+        self.estimated_minutes = np.array(estimated, dtype=np.float64)
+        self.actual_minutes = np.array(actual, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def mask(self, user_id: Optional[int] = None) -> "np.ndarray":
+        """Rows counted for a user, or every row
+
+        A task counts for the first of USER_FIELDS it sets. Tasks that name no
+        user are in everyone's task list, so they count for every user too.
+        """
+        if user_id is None:
+            return np.ones(len(self), dtype=bool)
+        return (self.user == user_id) | (self.user == -1)
+
+    def status_counts(self, user_id: Optional[int] = None) -> Dict[str, int]:
+        """Number of tasks per status"""
+        status = self.status[self.mask(user_id) & (self.status >= 0)]
+        counts = np.bincount(status, minlength=len(STATUS_CODES))
+        return {name: int(counts[code]) for name, code in STATUS_CODES.items()}
+
+    def weekly_throughput(self, user_id: Optional[int] = None, weeks: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Completed tasks per week (by completedAt), oldest first"""
+        done = self.mask(user_id) & (self.status == STATUS_CODES["completed"]) & ~np.isnat(self.completed_at)
+        days = self.completed_at[done].astype("datetime64[D]")
+        week_index = (days - np.datetime64(_WEEK_EPOCH, "D")).astype(np.int64) // 7
+        week_numbers, counts = np.unique(week_index, return_counts=True)
+        if weeks is not None:
+            week_numbers, counts = week_numbers[-weeks:], counts[-weeks:]
+        starts = np.datetime64(_WEEK_EPOCH, "D") + week_numbers * 7
+        return [
+            {"week": str(start), "completed": int(count)}
+            for start, count in zip(starts, counts)
+        ]
+
+    def time_accuracy(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Estimated versus actual minutes for tasks that record both, overall and per difficulty"""
+        both = self.mask(user_id) & ~np.isnan(self.estimated_minutes) & ~np.isnan(self.actual_minutes)
+        estimated = self.estimated_minutes[both]
+        actual = self.actual_minutes[both]
+
+        def summary(selected: "np.ndarray") -> Dict[str, Any]:
+            est_total = float(estimated[selected].sum())
+            actual_total = float(actual[selected].sum())
+            return {
+                "tasks": int(selected.sum()),
+                "estimatedMinutes": est_total,
+                "actualMinutes": actual_total,
+                "ratio": actual_total / est_total if est_total else None,
+            }
+
+        difficulty = self.difficulty[both]
+        return {
+            **summary(np.ones(len(estimated), dtype=bool)),
+            "byDifficulty": {name: summary(difficulty == code) for name, code in DIFFICULTY_CODES.items()},
+        }
+
+    def xp_distribution(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """XP of completed tasks: histogram, percentiles and totals per difficulty"""
+        done = self.mask(user_id) & (self.status == STATUS_CODES["completed"])
+        xp = self.xp[done]
+        values, counts = np.unique(xp, return_counts=True)
+        difficulty = self.difficulty[done]
+        known = difficulty >= 0
+        per_difficulty = np.bincount(difficulty[known], weights=xp[known], minlength=len(DIFFICULTY_CODES))
+        percentiles = np.percentile(xp, [50, 90, 99]).tolist() if len(xp) else [0, 0, 0]
+        return {
+            "tasks": int(len(xp)),
+            "total": int(xp.sum()),
+            "histogram": [{"xp": int(value), "tasks": int(count)} for value, count in zip(values, counts)],
+            "p50": percentiles[0],
+            "p90": percentiles[1],
+            "p99": percentiles[2],
+            "byDifficulty": {name: int(per_difficulty[code]) for name, code in DIFFICULTY_CODES.items()},
+        }
+
+
+class FrameCache:
+    """Keeps the TaskFrame built from a DataService for ttl seconds"""
+
+    def __init__(self, service: DataService = data_service, ttl: float = 60):
+        self.service = service
+        self.ttl = ttl
+        self._frame: Optional[TaskFrame] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> TaskFrame:
+        """Get the current frame, rebuilding it once it is older than ttl"""
+        if np is None:
+            raise AnalyticsUnavailable("Analytics requires numpy (pip install .[analytics])")
+        with self._lock:
+            if self._frame is None or time.monotonic() - self._built_at >= self.ttl:
+                self._frame = TaskFrame(self.service.get_all("tasks"))
+                self._built_at = time.monotonic()
+            return self._frame
+
+    def invalidate(self):
+        """Drop the cached frame"""
+        with self._lock:
+            self._frame = None
+
+
+_derived_lock = threading.Lock()
+
+
+def frame_cache_for(service: DataService) -> FrameCache:
+    """The frame cache over a service's tasks (one per shard), created on first use"""
+    with _derived_lock:
+        cache = service.derived.get("analytics")
+        if cache is None:
+            cache = service.derived["analytics"] = FrameCache(service, ttl=config.ANALYTICS_CACHE_TTL_S)
+    return cache
+
+
+frame_cache = FrameCache(ttl=config.ANALYTICS_CACHE_TTL_S)
+data_service.derived["analytics"] = frame_cache
@@ -1,7 +1,14 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app import config
 from app.services.data_service import data_service
 
 # Secret key for JWT (in production, use environment variable)
@@ -11,6 +18,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop
+_password_pool = ThreadPoolExecutor(max_workers=config.PASSWORD_WORKERS, thread_name_prefix="password")
+# One slot per running or queued job
+_password_slots = threading.BoundedSemaphore(config.PASSWORD_WORKERS + config.PASSWORD_QUEUE)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password worker pool queue is full"""
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -22,6 +38,30 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_in_password_pool(func, *args):
+    """Run a blocking password function in the worker pool, or raise PasswordPoolBusy"""
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordPoolBusy()
+    try:
+        future = _password_pool.submit(func, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # Free the slot when the job finishes, even if the caller stops waiting
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop"""
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_in_password_pool(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -34,26 +74,104 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+class TokenCache:
+    """Bounded LRU cache of verified token payloads, keyed by the token's SHA-256 digest.
+
+    Entries expire after ttl seconds or at the token's exp claim, whichever
+    comes first, so an expired token is never served from the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # digest -> (payload, expiry as a Unix timestamp)
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Get the cached payload of a token, or None on a miss"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: dict):
+        """Cache the payload of a verified token"""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        expiry = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expiry = min(expiry, exp)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), expiry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: Optional[str] = None):
+        """Drop one token (e.g. on logout), or every token when none is given (e.g. key rotation)"""
+        with self._lock:
+            if token is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(token), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+token_cache = TokenCache(maxsize=config.TOKEN_CACHE_SIZE, ttl=config.TOKEN_CACHE_TTL_S)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
+    """Decode and verify a JWT token, reusing the result for tokens seen recently"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    token_cache.put(token, payload)
+    return payload
+
+
+def invalidate_access_token(token: Optional[str] = None):
+    """Forget cached verification of a token, or of all tokens when none is given"""
+    token_cache.invalidate(token)
+
 
+async def authenticate_user(username: str, password: str) -> Optional[dict]:
+    """Authenticate a user using data from data_service
 
-def authenticate_user(username: str, password: str) -> Optional[dict]:
-    """Authenticate a user using data from data_service"""
+    Raises PasswordPoolBusy when too many logins are already waiting on bcrypt.
+    """
     # Get auth credentials from data_service (unified data entry point)
-    auth_cred = data_service.get_auth_credentials(username)
+    auth_cred = await data_service.arun(data_service.get_auth_credentials, username)
     if not auth_cred:
         return None
     
     # Check if password matches
     # If password_hash exists, verify against it; otherwise check plain password
     if "password_hash" in auth_cred:
-        if verify_password(password, auth_cred["password_hash"]):
+        if await averify_password(password, auth_cred["password_hash"]):
             return {
                 "username": username,
                 "user_id": auth_cred["user_id"]
@@ -1,216 +1,523 @@
+import asyncio
+import base64
+import binascii
+import copy
 import json
-import os
-from typing import Any, Dict, List, Optional
+import logging
+import secrets
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
 from pathlib import Path
 
+from app import config
+from app.services.storage import COLLECTION_FILES, PARTITIONED_COLLECTIONS, StorageBackend, create_backend, normalize_id
+
+
+logger = logging.getLogger(__name__)
+
+# Page size used when a cursor is given without a limit
+DEFAULT_PAGE_SIZE = 100
+
+# Called by the bulk methods for each changed item as on_change(tx, before, after),
+# where before/after are None for created/deleted items
+ChangeCallback = Callable[["Transaction", Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]
+
+# Called by bulk_write with the (changes, stored item) pairs of the items about to be updated
+PrepareCallback = Callable[[List[Tuple[Dict[str, Any], Dict[str, Any]]]], None]
+
+# Called after every write as hook(collection, op, item_id, item), where op is
+# "create", "update" or "delete" and item is the stored item (None on delete)
+WriteHook = Callable[[str, str, Any, Optional[Dict[str, Any]]], None]
+
+T = TypeVar("T")
+
+# Runs the blocking part of the async API (reloads from disk, JSON encoding, file
+# writes), shared by every DataService so shards do not each start threads
+IO_THREAD_PREFIX = "storage-io"
+_io_pool = ThreadPoolExecutor(max_workers=config.STORAGE_IO_WORKERS, thread_name_prefix=IO_THREAD_PREFIX)
+
+
+def create_configured_backend(data_dir: Path, sqlite_path: Path, **json_options: Any) -> StorageBackend:
+    """Create the storage backend selected in app.config for a data directory"""
+    return create_backend(
+        config.STORAGE_BACKEND,
+        data_dir,
+        sqlite_path,
+        multiprocess=config.MULTIPROCESS,
+        write_behind=config.WRITE_BEHIND,
+        flush_interval=config.FLUSH_INTERVAL_MS / 1000,
+        flush_max_dirty=config.FLUSH_MAX_DIRTY,
+        journal=config.JOURNAL,
+        journal_max_bytes=config.JOURNAL_MAX_BYTES,
+        reload_policy=config.RELOAD_POLICY,
+        reload_ttl=config.RELOAD_TTL_MS / 1000,
+        snapshot_format=config.SNAPSHOT_FORMAT,
+        lazy=config.SNAPSHOT_LAZY,
+        **json_options,
+    )
+
+
+def _weak_listener(method: Callable[[str], None]) -> Callable[[str], None]:
+    """Wrap a bound method so whoever holds the wrapper does not keep its object alive"""
+    ref = weakref.WeakMethod(method)
+
+    def listener(collection: str):
+        target = ref()
+        if target is not None:
+            target(collection)
+
+    return listener
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(item_id: Any) -> str:
+    """Encode the last ID of a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(item_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Decode a cursor produced by encode_cursor back into an ID"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    if not isinstance(item_id, (int, str)) or isinstance(item_id, bool):
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return item_id
+
+
+def project(item: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Keep only the given fields of an item (the ID is always kept)"""
+    projected = {"id": item["id"]} if "id" in item else {}
+    for field in fields:
+        if field in item:
+            projected[field] = item[field]
+    return projected
+
+
+class Transaction:
+    """Unit of work over a fixed set of collections, see DataService.transaction.
+
+    Reads return private copies with the transaction's own changes applied;
+    writes are staged and only reach the store when the transaction commits.
+    """
+
+    def __init__(self, service: "DataService", collections: Sequence[str]):
+        self._service = service
+        self.collections = frozenset(collections)
+        # Staged operations in order: (op, collection, item_id, payload)
+        self._operations: List[Tuple[str, str, Any, Optional[Dict[str, Any]]]] = []
+        # Latest staged state per record; None marks a deleted record
+        self._staged: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+
+    def _check(self, collection: str):
+        if collection not in self.collections:
+            raise ValueError(f"Collection not locked by this transaction: {collection}")
+
+    def get(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        """Get a copy of an item as this transaction sees it"""
+        self._check(collection)
+        key = (collection, normalize_id(item_id))
+        if key in self._staged:
+            staged = self._staged[key]
+            return copy.deepcopy(staged) if staged is not None else None
+        item = self._service.backend.get_by_id(collection, item_id)
+        return copy.deepcopy(item) if item is not None else None
+
+    def create(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage a new item; items without an ID get one on commit (set on the returned dict)"""
+        self._check(collection)
+        item = copy.deepcopy(item)
+        self._operations.append(("create", collection, item.get("id"), item))
+        if "id" in item:
+            self._staged[(collection, normalize_id(item["id"]))] = item
+        return item
+
+    def update(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Stage an update and return the item as it will be stored, or None if it does not exist"""
+        current = self.get(collection, item_id)
+        if current is None:
+            return None
+        updates = copy.deepcopy(updates)
+        self._operations.append(("update", collection, item_id, updates))
+        updated = {**current, **updates}
+        self._staged[(collection, normalize_id(item_id))] = updated
+        return copy.deepcopy(updated)
+
+    def delete(self, collection: str, item_id: Any) -> bool:
+        """Stage a deletion; returns False if the item does not exist"""
+        if self.get(collection, item_id) is None:
+            return False
+        self._operations.append(("delete", collection, item_id, None))
+        self._staged[(collection, normalize_id(item_id))] = None
+        return True
+
+    def commit(self):
+        """Apply the staged operations as one batch, persisting each changed file once"""
+        backend = self._service.backend
+        applied = []
+        with backend.batch():
+            for op, collection, item_id, payload in self._operations:
+                if op == "create":
+                    item = backend.create(collection, payload)
+                    applied.append((collection, op, item.get("id"), item))
+                elif op == "update":
+                    item = backend.update(collection, item_id, payload)
+                    if item is not None:
+                        applied.append((collection, op, item_id, item))
+                elif backend.delete(collection, item_id):
+                    applied.append((collection, op, item_id, None))
+        for change in applied:
+            self._service._notify(*change)
+        self._operations.clear()
+        self._staged.clear()
+
 
 class DataService:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: Optional[str] = None, backend: Optional[StorageBackend] = None):
         # Get the project root directory (assuming this file is in app/services/)
         current_dir = Path(__file__).parent.parent.parent
-        self.data_dir = current_dir / data_dir
-        
-        # Map collections to their JSON files
-        self._file_map = {
-            "users": "mock_users.json",
-            "authCredentials": "mock_users.json",
-            "tasks": "mock_tasks.json",
-            "calendarEvents": "mock_tasks.json",
-            "projects": "mock_projects.json",
-            "shopItems": "mock_items.json",
-            "achievements": "mock_achievements.json",
-            "teams": "mock_teams.json",
-            "contexts": "mock_contexts.json",
-            "scheduledCategories": "mock_contexts.json",
-            "reports": "mock_report.json",
-        }
-        
-        # Cache for loaded data
-        self._data_cache: Dict[str, Dict[str, Any]] = {}
-        # Cache for file modification times
-        self._file_mtimes: Dict[str, float] = {}
-        self._load_all_data()
-        self._cache_file_mtimes()
-    
-    def _get_file_path(self, collection: str) -> Path:
-        """Get the file path for a collection"""
-        filename = self._file_map.get(collection)
-        if not filename:
-            raise ValueError(f"Unknown collection: {collection}")
-        return self.data_dir / filename
-    
-    def _load_file(self, filename: str) -> Dict[str, Any]:
-        """Load data from a JSON file"""
-        file_path = self.data_dir / filename
-        if file_path.exists():
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
-    
-    def _save_file(self, filename: str, data: Dict[str, Any]):
-        """Save data to a JSON file"""
-        file_path = self.data_dir / filename
-        # Ensure directory exists
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    def _load_all_data(self):
-        """Load all data files into cache"""
-        # Load each unique file once
-        loaded_files = {}
-        for collection, filename in self._file_map.items():
-            if filename not in loaded_files:
-                loaded_files[filename] = self._load_file(filename)
-            self._data_cache[filename] = loaded_files[filename]
-    
-    def _cache_file_mtimes(self):
-        """Cache modification times of all data files"""
-        for filename in set(self._file_map.values()):
-            file_path = self.data_dir / filename
-            if file_path.exists():
-                self._file_mtimes[filename] = os.path.getmtime(file_path)
-    
-    def _check_and_reload_file(self, filename: str):
-        """Check if file has been modified and reload if necessary"""
-        file_path = self.data_dir / filename
-        if not file_path.exists():
-            return
-        
-        current_mtime = os.path.getmtime(file_path)
-        cached_mtime = self._file_mtimes.get(filename)
-        
-        # 如果文件有改动，重新加载
-        if cached_mtime is None or current_mtime > cached_mtime:
-            self._data_cache[filename] = self._load_file(filename)
-            self._file_mtimes[filename] = current_mtime
-    
-    def _get_collection_data(self, collection: str) -> List[Dict[str, Any]]:
-        """Get the data array for a collection from the appropriate file"""
-        filename = self._file_map.get(collection)
-        if not filename:
-            return []
-        
-        # 检查文件是否有改动，如果有则自动重新加载
-        self._check_and_reload_file(filename)
-        
-        file_data = self._data_cache.get(filename, {})
-        
-        # Handle special cases
-        if collection == "authCredentials":
-            return file_data.get("authCredentials", [])
-        elif collection == "calendarEvents":
-            return file_data.get("calendarEvents", [])
-        elif collection == "teams":
-            return file_data.get("teams", [])
-        elif collection == "contexts":
-            return file_data.get("contexts", [])
-        elif collection == "scheduledCategories":
-            return file_data.get("scheduledCategories", [])
-        elif collection == "reports":
-            return file_data.get("reports", [])
-        else:
-            # Standard collections: users, tasks, projects, shopItems, achievements
-            return file_data.get(collection, [])
-    
-    def _save_collection_data(self, collection: str, data: List[Dict[str, Any]]):
-        """Save collection data back to its file"""
-        filename = self._file_map.get(collection)
-        if not filename:
-            raise ValueError(f"Unknown collection: {collection}")
-        
-        file_data = self._data_cache.get(filename, {})
-        
-        # Handle special cases
-        if collection == "authCredentials":
-            file_data["authCredentials"] = data
-        elif collection == "calendarEvents":
-            file_data["calendarEvents"] = data
-        elif collection == "teams":
-            file_data["teams"] = data
-        elif collection == "contexts":
-            file_data["contexts"] = data
-        elif collection == "scheduledCategories":
-            file_data["scheduledCategories"] = data
-        elif collection == "reports":
-            file_data["reports"] = data
-        else:
-            # Standard collections
-            file_data[collection] = data
-        
-        self._data_cache[filename] = file_data
-        self._save_file(filename, file_data)
-        # 更新文件修改时间缓存
-        file_path = self.data_dir / filename
-        if file_path.exists():
-            self._file_mtimes[filename] = os.path.getmtime(file_path)
-    
+        self.data_dir = current_dir / (data_dir or config.DATA_DIR)
+
+        # Storage engine holding the collections (JSON files or SQLite). With sharding
+        # the partitioned collections live in the shards instead (see app/services/shards.py)
+        if backend is None:
+            json_options = {}
+            if config.SHARD_BY != "none":
+                json_options["collections"] = [name for name in COLLECTION_FILES if name not in PARTITIONED_COLLECTIONS]
+            backend = create_configured_backend(self.data_dir, current_dir / config.SQLITE_PATH, **json_options)
+        self.backend = backend
+        # Per-collection write locks, taken in name order by transactions
+        self._collection_locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self._write_hooks: List[WriteHook] = []
+        # Per-collection versions, bumped on every write and on reload from disk.
+        # The instance ID keeps ETags from matching across restarts.
+        self.instance_id = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+        # Held weakly, so a shard's backend does not keep an evicted shard alive
+        self.backend.reload_listener = _weak_listener(self._bump_version)
+        # State derived from this service's data (search index, analytics frame), by name
+        self.derived: Dict[str, Any] = {}
+        # asyncio locks of the async API: event loop -> data file -> lock
+        self._file_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _bump_version(self, collection: str):
+        with self._versions_lock:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    def version(self, collection: str, refresh: bool = True) -> int:
+        """Get the version of a collection; it changes whenever the collection does
+
+        refresh=False skips checking the backend for outside changes.
+        """
+        if refresh:
+            self.backend.refresh(collection)
+        return self._versions.get(collection, 0)
+
+    def etag(self, *collections: str) -> str:
+        """Weak ETag for a representation built from the given collections"""
+        versions = "-".join(str(self.version(collection)) for collection in collections)
+        return f'W/"{self.instance_id}-{versions}"'
+
+    def add_write_hook(self, hook: WriteHook):
+        """Register a function called after every create, update and delete"""
+        self._write_hooks.append(hook)
+
+    def remove_write_hook(self, hook: WriteHook):
+        """Unregister a write hook"""
+        self._write_hooks.remove(hook)
+
+    def _notify(self, collection: str, op: str, item_id: Any, item: Optional[Dict[str, Any]]):
+        """Bump the collection version and run the write hooks
+
+        Runs under the collection lock, so hooks see writes in order.
+        """
+        self._bump_version(collection)
+        for hook in list(self._write_hooks):
+            try:
+                hook(collection, op, item_id, item)
+            except Exception:
+                logger.exception("Write hook %r failed for %s %s %s", hook, op, collection, item_id)
+
+    def _collection_lock(self, collection: str) -> threading.RLock:
+        with self._locks_guard:
+            lock = self._collection_locks.get(collection)
+            if lock is None:
+                lock = self._collection_locks[collection] = threading.RLock()
+            return lock
+
+    @contextmanager
+    def transaction(self, *collections: str) -> Iterator[Transaction]:
+        """Run a read-modify-write across collections atomically
+
+        Locks the given collections for the duration of the block, so other
+        writers to them wait. Changes staged on the yielded Transaction are
+        committed together when the block exits normally and discarded if it
+        raises. In multi-process mode writers in other worker processes wait too.
+
+            with data_service.transaction("tasks", "users") as tx:
+                user = tx.get("users", user_id)
+                tx.update("users", user_id, {"gold": user["gold"] + 10})
+        """
+        locks = [self._collection_lock(collection) for collection in sorted(set(collections))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self.backend.exclusive():
+                tx = Transaction(self, collections)
+                yield tx
+                tx.commit()
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def bulk_write(
+        self,
+        collection: str,
+        create: Sequence[Dict[str, Any]] = (),
+        update: Sequence[Tuple[Any, Dict[str, Any]]] = (),
+        delete: Sequence[Any] = (),
+        lock: Sequence[str] = (),
+        on_change: Optional[ChangeCallback] = None,
+        prepare_updates: Optional[PrepareCallback] = None,
+    ) -> Dict[str, List[Any]]:
+        """Apply many creates, updates and deletes to a collection in one transaction
+
+        Everything happens under one lock and is persisted once. update holds
+        (item_id, changes) pairs. Results are per item, in order: "created"
+        holds the new items, "updated" the updated item or None when it does
+        not exist, "deleted" True or False. on_change is called inside the
+        transaction for every changed item, e.g. to maintain derived data in
+        the extra collections listed in lock. prepare_updates is called once
+        inside the transaction, before any update, with the (changes, stored
+        item) pairs of the items that exist; it may add to the changes.
+        """
+        results: Dict[str, List[Any]] = {"created": [], "updated": [], "deleted": []}
+        with self.transaction(collection, *lock) as tx:
+            for item in create:
+                created = tx.create(collection, item)
+                results["created"].append(created)
+                if on_change:
+                    on_change(tx, None, created)
+            befores = [tx.get(collection, item_id) for item_id, _ in update]
+            if prepare_updates:
+                prepare_updates(
+                    [(changes, before) for (_, changes), before in zip(update, befores) if before is not None]
+                )
+            for (item_id, changes), before in zip(update, befores):
+                updated = tx.update(collection, item_id, changes) if before is not None else None
+                results["updated"].append(updated)
+                if on_change and updated is not None:
+                    on_change(tx, before, updated)
+            for item_id in delete:
+                before = tx.get(collection, item_id)
+                deleted = before is not None and tx.delete(collection, item_id)
+                results["deleted"].append(deleted)
+                if on_change and deleted:
+                    on_change(tx, before, None)
+        return results
+
+    def bulk_create(self, collection: str, items: Sequence[Dict[str, Any]], **options: Any) -> List[Dict[str, Any]]:
+        """Create many items at once, see bulk_write"""
+        return self.bulk_write(collection, create=items, **options)["created"]
+
+    def bulk_update(
+        self, collection: str, updates: Sequence[Tuple[Any, Dict[str, Any]]], **options: Any
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Update many items at once from (item_id, changes) pairs, see bulk_write"""
+        return self.bulk_write(collection, update=updates, **options)["updated"]
+
+    def bulk_delete(self, collection: str, item_ids: Sequence[Any], **options: Any) -> List[bool]:
+        """Delete many items at once, see bulk_write"""
+        return self.bulk_write(collection, delete=item_ids, **options)["deleted"]
+
     def get_all(self, collection: str) -> List[Dict[str, Any]]:
         """Get all items from a collection"""
-        return self._get_collection_data(collection)
-    
+        return self.backend.get_all(collection)
+
     def get_by_id(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
         """Get an item by ID from a collection"""
-        items = self.get_all(collection)
-        # Handle both int and string IDs
-        for item in items:
-            if item.get("id") == item_id or str(item.get("id")) == str(item_id):
-                return item
-        return None
-    
+        return self.backend.get_by_id(collection, item_id)
+
     def create(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new item in a collection"""
-        items = self.get_all(collection)
-        
-        # Auto-generate ID if not provided
-        if "id" not in item:
-            if items:
-                # Find max ID
-                max_id = max(
-                    int(i.get("id", 0)) if isinstance(i.get("id"), int) else 0
-                    for i in items
-                )
-                item["id"] = max_id + 1
-            else:
-                item["id"] = 1
-        
-        items.append(item)
-        self._save_collection_data(collection, items)
-        return item
-    
+        with self._collection_lock(collection):
+            created = self.backend.create(collection, item)
+            self._notify(collection, "create", created.get("id"), created)
+            return created
+
     def update(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update an item in a collection"""
-        items = self.get_all(collection)
-        for i, item in enumerate(items):
-            if item.get("id") == item_id or str(item.get("id")) == str(item_id):
-                updated_item = {**item, **updates}
-                items[i] = updated_item
-                self._save_collection_data(collection, items)
-                return updated_item
-        return None
-    
+        with self._collection_lock(collection):
+            updated = self.backend.update(collection, item_id, updates)
+            if updated is not None:
+                self._notify(collection, "update", item_id, updated)
+            return updated
+
     def delete(self, collection: str, item_id: Any) -> bool:
         """Delete an item from a collection"""
-        items = self.get_all(collection)
-        for i, item in enumerate(items):
-            if item.get("id") == item_id or str(item.get("id")) == str(item_id):
-                items.pop(i)
-                self._save_collection_data(collection, items)
-                return True
-        return False
-    
+        with self._collection_lock(collection):
+            deleted = self.backend.delete(collection, item_id)
+            if deleted:
+                self._notify(collection, "delete", item_id, None)
+            return deleted
+
     def filter(self, collection: str, predicate: callable) -> List[Dict[str, Any]]:
         """Filter items in a collection"""
-        items = self.get_all(collection)
-        return [item for item in items if predicate(item)]
-    
+        return self.backend.filter(collection, predicate)
+
+    def query(self, collection: str, **filters: Any) -> List[Dict[str, Any]]:
+        """Get the items whose fields equal the given values, e.g. query("tasks", status="inbox")
+
+        Filters set to None are ignored. Indexed fields (see INDEXED_FIELDS) are
+        answered from secondary indexes instead of a full scan.
+        """
+        return self.backend.query(collection, **filters)
+
+    def page(
+        self,
+        collection: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        **filters: Any,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of a collection and the cursor of the next page (None on the last page)
+
+        With a limit or cursor, items are ordered by ID and only the page is read
+        (DEFAULT_PAGE_SIZE items when only a cursor is given);
+        without either, every matching item is returned in stored order. fields
+        projects each item down to the given fields.
+        """
+        next_cursor = None
+        if limit is None and cursor is None:
+            items = self.query(collection, **filters)
+        else:
+            if limit is None:
+                limit = DEFAULT_PAGE_SIZE
+            after = decode_cursor(cursor) if cursor else None
+            # Ask for one extra item to learn whether another page follows
+            items = self.backend.page(collection, limit + 1, after, **filters)
+            if len(items) > limit:
+                items = items[:limit]
+                next_cursor = encode_cursor(items[-1].get("id"))
+        if fields:
+            items = [project(item, fields) for item in items]
+        return items, next_cursor
+
     def get_auth_credentials(self, username: str) -> Optional[Dict[str, Any]]:
         """Get authentication credentials for a username"""
-        credentials = self.get_all("authCredentials")
-        for cred in credentials:
-            if cred.get("username") == username:
-                return cred
-        return None
+        return self.backend.get_auth_credentials(username)
+
+    # Async API for route handlers: the same operations, run in the storage I/O pool so
+    # slow disks and large files do not stall the event loop. Async writers first queue
+    # on a per-file asyncio.Lock, so waiting writers do not tie up pool threads.
+
+    async def arun(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run blocking code that uses the store (e.g. a report builder) in the storage I/O pool"""
+        return await asyncio.wrap_future(_io_pool.submit(func, *args, **kwargs))
+
+    def _file_lock(self, collection: str) -> asyncio.Lock:
+        """asyncio lock of the data file holding a collection, for the running event loop"""
+        locks = self._file_locks.setdefault(asyncio.get_running_loop(), {})
+        filename = COLLECTION_FILES.get(collection, collection)
+        lock = locks.get(filename)
+        if lock is None:
+            lock = locks[filename] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def _afile_locks(self, collections: Iterable[str]) -> AsyncIterator[None]:
+        """Hold the asyncio locks of the files of the collections, taken in file name order"""
+        locks = {COLLECTION_FILES.get(collection, collection): self._file_lock(collection) for collection in collections}
+        acquired = []
+        try:
+            for _, lock in sorted(locks.items()):
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    async def aget_all(self, collection: str) -> List[Dict[str, Any]]:
+        """Get all items from a collection without blocking the event loop"""
+        return await self.arun(self.get_all, collection)
+
+    async def aget_by_id(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        """Get an item by ID without blocking the event loop"""
+        return await self.arun(self.get_by_id, collection, item_id)
+
+    async def aquery(self, collection: str, **filters: Any) -> List[Dict[str, Any]]:
+        """Query a collection without blocking the event loop, see query"""
+        return await self.arun(self.query, collection, **filters)
+
+    async def apage(
+        self,
+        collection: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        **filters: Any,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of a collection without blocking the event loop, see page"""
+        return await self.arun(self.page, collection, limit, cursor, fields, **filters)
+
+    async def aetag(self, *collections: str) -> str:
+        """ETag of the given collections, checking for outside changes off the event loop"""
+        return await self.arun(self.etag, *collections)
+
+    async def acreate(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new item without blocking the event loop"""
+        async with self._afile_locks([collection]):
+            return await self.arun(self.create, collection, item)
+
+    async def aupdate(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an item without blocking the event loop"""
+        async with self._afile_locks([collection]):
+            return await self.arun(self.update, collection, item_id, updates)
+
+    async def adelete(self, collection: str, item_id: Any) -> bool:
+        """Delete an item without blocking the event loop"""
+        async with self._afile_locks([collection]):
+            return await self.arun(self.delete, collection, item_id)
+
+    async def atransaction(self, collections: Sequence[str], func: Callable[..., T], *args: Any) -> T:
+        """Run func(tx, *args) in a transaction over the collections in the I/O pool; returns its result
+
+        Like transaction(), the staged changes are committed when func returns
+        and discarded if it raises (e.g. an HTTPException).
+        """
+        def run() -> T:
+            with self.transaction(*collections) as tx:
+                return func(tx, *args)
+
+        async with self._afile_locks(collections):
+            return await self.arun(run)
+
+    async def abulk_write(self, collection: str, **options: Any) -> Dict[str, List[Any]]:
+        """Apply many creates, updates and deletes without blocking the event loop, see bulk_write"""
+        async with self._afile_locks([collection, *options.get("lock", ())]):
+            return await self.arun(self.bulk_write, collection, **options)
+
+    def flush(self):
+        """Write pending changes to disk (write-behind mode)"""
+        self.backend.flush()
+
+    def close(self):
+        """Flush pending changes and release resources held by the storage backend"""
+        self.backend.close()
 
 
 # Global instance
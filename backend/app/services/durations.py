@@ -0,0 +1,17 @@
+import re
+from typing import Optional
+
+# Task durations (estimatedTime) as entered in the Clarify step: hours and/or
+# minutes, e.g. "15m", "1h", "1.5h" or "1h 30m"
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(h|m)", re.IGNORECASE)
+
+
+def parse_minutes(estimated_time: Optional[str]) -> int:
+    """Convert an estimatedTime such as "15m", "1h" or "1h 30m" to minutes"""
+    if not estimated_time:
+        return 0
+    minutes = 0.0
+    for amount, unit in _DURATION_PATTERN.findall(estimated_time):
+        minutes += float(amount) * (60 if unit.lower() == "h" else 1)
+    return int(minutes)
@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import json
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from app import config
+from app.services import report_engine
+from app.services.data_service import data_service
+from app.services.shards import shard_manager
+
+# In-process pub/sub for DataService writes. Every write becomes one event,
+# encoded once and fanned out to the subscribers of its collection. Each
+# subscriber has a bounded queue; when it overflows the queued events are
+# dropped and replaced by a single "resync" event telling the client to
+# reload the collections it follows.
+
+# Collections of per-user records: their events only reach the owner's own
+# subscriptions. Maps the collection to the owner of a changed record as
+# owner(item_id, item), compared as a string (item is None on delete).
+USER_SCOPED_COLLECTIONS: Dict[str, Callable[[Any, Optional[Dict[str, Any]]], str]] = {
+    "users": lambda item_id, item: str(item_id),
+    report_engine.COLLECTION: lambda item_id, item: (
+        str(item["userId"]) if item else report_engine.bucket_owner(item_id)
+    ),
+}
+
+
+class Subscription:
+    """One client's feed of events for a set of collections"""
+
+    def __init__(
+        self,
+        hub: "EventHub",
+        collections: FrozenSet[str],
+        maxsize: int,
+        user_id: Any,
+        shard: Optional[str] = None,
+    ):
+        self.hub = hub
+        self.collections = collections
+        # Owner whose records of the user-scoped collections this subscriber may see
+        self.user = str(user_id)
+        # Shard whose partitioned collections this subscriber may see (None: sharding off)
+        self.shard = shard
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def _deliver(self, event: Dict[str, Any]):
+        """Queue an event; runs on the subscriber's event loop"""
+        if self.queue.full():
+            # Too far behind: drop the backlog and ask the client to reload instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(self.hub.resync_event(self.collections))
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for the next event, or None after timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        """Stop receiving events"""
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """Fans DataService write events out to subscribers"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def subscribe(self, collections: Iterable[str], user_id: Any, shard: Optional[str] = None) -> Subscription:
+        """Subscribe the running event loop to a user's view of the given collections (of one shard, if sharded)"""
+        subscription = Subscription(self, frozenset(collections), self.queue_size, user_id, shard)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def resync_event(self, collections: Iterable[str]) -> Dict[str, Any]:
+        return {
+            "id": next(self._sequence),
+            "event": "resync",
+            "data": json.dumps({"collections": sorted(collections)}),
+        }
+
+    def publish(self, collection: str, op: str, item_id: Any, item: Optional[Dict[str, Any]]):
+        """Write hook: send a change to every subscriber of its collection (callable from any thread)"""
+        self._publish(None, collection, op, item_id, item)
+
+    def publish_shard(self, shard: str, collection: str, op: str, item_id: Any, item: Optional[Dict[str, Any]]):
+        """Shard write hook: send a change to the subscribers of its collection in that shard"""
+        self._publish(shard, collection, op, item_id, item)
+
+    def _publish(self, shard: Optional[str], collection: str, op: str, item_id: Any, item: Optional[Dict[str, Any]]):
+        owner = USER_SCOPED_COLLECTIONS.get(collection)
+        owner_id = owner(item_id, item) if owner else None
+        with self._lock:
+            subscribers = [
+                sub for sub in self._subscriptions
+                if collection in sub.collections
+                and (shard is None or sub.shard == shard)
+                and (owner_id is None or sub.user == owner_id)
+            ]
+        if not subscribers:
+            return
+        # Encode once here: the item may change after the hook returns
+        event = {
+            "id": next(self._sequence),
+            "event": op,
+            "data": json.dumps({"collection": collection, "id": item_id, "item": item}, ensure_ascii=False),
+        }
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+
+
+event_hub = EventHub(queue_size=config.EVENT_QUEUE_SIZE)
+data_service.add_write_hook(event_hub.publish)
+shard_manager.add_write_hook(event_hub.publish_shard)
@@ -0,0 +1,187 @@
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Minimal in-process metrics in the Prometheus text exposition format.
+# Counters and histograms are kept per label set behind one lock each;
+# render() produces the body served at /metrics.
+
+# Request and save latencies, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Items visited by one lookup
+SCAN_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+    """The metrics exported together"""
+
+    def __init__(self):
+        self._metrics: List["Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric"):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = Registry()
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _lines(self) -> List[str]:
+        """Sample lines of the metric, without the HELP and TYPE header"""
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self._lines())
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: object):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _lines(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, plus their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts (not cumulative), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: object):
+        key = self._key(labels)
+        at = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][at] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def _lines(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render() -> str:
+    """The body of /metrics"""
+    return REGISTRY.render()
+
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    "coreterra_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+)
+
+# Storage (JSON engine files, see app/services/storage)
+STORAGE_RELOADS = Counter(
+    "coreterra_storage_reloads_total",
+    "Data files reloaded from disk after an outside change",
+    ["file"],
+)
+STORAGE_SERIALIZE_SECONDS = Histogram(
+    "coreterra_storage_serialize_seconds",
+    "Time spent encoding a data file before writing it",
+    ["file"],
+)
+STORAGE_SAVE_SECONDS = Histogram(
+    "coreterra_storage_save_seconds",
+    "Time spent writing, syncing and replacing a data file",
+    ["file"],
+)
+STORAGE_SAVE_BYTES = Counter(
+    "coreterra_storage_save_bytes_total",
+    "Bytes of data files written",
+    ["file"],
+)
+STORAGE_SCAN_LENGTH = Histogram(
+    "coreterra_storage_scan_length",
+    "Items visited by one lookup (full scans and index candidates)",
+    ["collection", "lookup"],
+    buckets=SCAN_BUCKETS,
+)
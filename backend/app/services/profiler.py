@@ -0,0 +1,78 @@
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Dict, Optional, Sequence
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+# Innermost frame of a thread pool worker waiting for work
+_IDLE_WORKER = "thread.py:_worker"
+
+
+class SamplingProfiler:
+    """Samples Python stacks of one thread, plus worker threads named with a prefix, from a background thread
+
+    Stacks are counted in the folded format ("outer;inner count" per line)
+    understood by flamegraph.pl and speedscope, rooted at the thread name.
+    Idle pool workers are not counted.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005, thread_prefixes: Sequence[str] = ()):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.thread_prefixes = tuple(thread_prefixes)
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _threads(self) -> Dict[int, str]:
+        """Thread ID -> name of the sampled threads"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        threads = {self.thread_id: names.get(self.thread_id, "thread")}
+        if self.thread_prefixes:
+            for ident, name in names.items():
+                if name.startswith(self.thread_prefixes):
+                    threads[ident] = name
+        return threads
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for thread_id, name in self._threads().items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if thread_id != self.thread_id and stack[0] == _IDLE_WORKER:
+                continue
+            stack.append(name)
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the stack counts"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+    def folded(self) -> str:
+        """The samples in the folded stack format, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
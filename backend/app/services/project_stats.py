@@ -0,0 +1,71 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.data_service import DataService, Transaction, data_service
+
+# Materialized per-project task counters (totalTasks, completedTasks, progress).
+# Task writes adjust only the projects they touch; rebuild() recomputes everything
+# with a single pass over the tasks.
+
+
+def _contribution(task: Optional[Dict[str, Any]]) -> Tuple[Optional[Any], int]:
+    """The project a task counts towards and whether it counts as completed"""
+    if not task or not task.get("projectId"):
+        return None, 0
+    return task["projectId"], 1 if task.get("status") == "completed" else 0
+
+
+def counters(total: int, completed: int) -> Dict[str, int]:
+    """Counter fields for a project with the given task counts"""
+    progress = round(completed * 100 / total) if total else 0
+    return {"totalTasks": total, "completedTasks": completed, "progress": progress}
+
+
+def apply_task_change(tx: Transaction, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+    """Adjust project counters for a task going from before to after (None = absent)
+
+    Must run inside a transaction that also holds "projects".
+    """
+    deltas: Dict[str, List[int]] = {}
+    for task, sign in ((before, -1), (after, 1)):
+        project_id, completed = _contribution(task)
+        if project_id is None:
+            continue
+        delta = deltas.setdefault(project_id, [0, 0])
+        delta[0] += sign
+        delta[1] += sign * completed
+
+    for project_id, (total_delta, completed_delta) in deltas.items():
+        if not total_delta and not completed_delta:
+            continue
+        project = tx.get("projects", project_id)
+        if project is None:
+            continue
+        total = max(project.get("totalTasks", 0) + total_delta, 0)
+        completed = min(max(project.get("completedTasks", 0) + completed_delta, 0), total)
+        tx.update("projects", project_id, counters(total, completed))
+
+
+def rebuild(service: DataService = data_service, task_sources: Optional[Iterable[DataService]] = None) -> int:
+    """Recompute every project's counters from the tasks; returns the number of projects changed
+
+    task_sources are the services holding the tasks (e.g. every shard), default service itself.
+    Every write that moves a counter also locks "projects", so holding it is enough then.
+    """
+    collections = ("projects",) if task_sources is not None else ("tasks", "projects")
+    with service.transaction(*collections) as tx:
+        totals: Dict[str, List[int]] = {}
+        for source in task_sources if task_sources is not None else [service]:
+            for task in source.get_all("tasks"):
+                project_id, completed = _contribution(task)
+                if project_id is not None:
+                    total = totals.setdefault(str(project_id), [0, 0])
+                    total[0] += 1
+                    total[1] += completed
+
+        changed = 0
+        for project in service.get_all("projects"):
+            expected = counters(*totals.get(str(project.get("id")), (0, 0)))
+            if any(project.get(field) != value for field, value in expected.items()):
+                tx.update("projects", project["id"], expected)
+                changed += 1
+    return changed
@@ -0,0 +1,147 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.services.data_service import DataService, Transaction, data_service
+from app.services.durations import parse_minutes
+
+# Per-user report rollups, one record per user, period and bucket, e.g.
+# "1:daily:2025-01-01", "1:weekly:2024-12-30" (weeks start on Monday) and
+# "1:monthly:2025-01-01". complete_task adds to the three buckets of the
+# completion time, so report endpoints read a bucket instead of the history.
+
+COLLECTION = "reportRollups"
+PERIODS = ("daily", "weekly", "monthly")
+
+
+def bucket_start(period: str, day: date) -> date:
+    """First day of the bucket containing day"""
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def bucket_id(user_id: Any, period: str, day: date) -> str:
+    """ID of the rollup record for a user's bucket containing day"""
+    return f"{user_id}:{period}:{bucket_start(period, day).isoformat()}"
+
+
+def bucket_owner(rollup_id: Any) -> str:
+    """User ID (as a string) of the rollup record with the given ID"""
+    return str(rollup_id).partition(":")[0]
+
+
+def _parse_day(timestamp: Optional[str]) -> Optional[date]:
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+def _empty_bucket(user_id: Any, period: str, day: date) -> Dict[str, Any]:
+    return {
+        "id": bucket_id(user_id, period, day),
+        "userId": user_id,
+        "period": period,
+        "start": bucket_start(period, day).isoformat(),
+        "completedTasks": 0,
+        "xpEarned": 0,
+        "minutes": 0,
+        "minutesByContext": {},
+        "minutesByProject": {},
+    }
+
+
+def _add_completion(bucket: Dict[str, Any], task: Dict[str, Any], xp: int):
+    """Add one completed task to a bucket in place"""
+    minutes = parse_minutes(task.get("estimatedTime"))
+    bucket["completedTasks"] += 1
+    bucket["xpEarned"] += xp
+    bucket["minutes"] += minutes
+    for field, key in (("minutesByContext", task.get("contextId")), ("minutesByProject", task.get("projectId"))):
+        if key is not None:
+            bucket[field][str(key)] = bucket[field].get(str(key), 0) + minutes
+
+
+def record_completion(tx: Transaction, user_id: Any, task: Dict[str, Any], xp: int, completed_at: str):
+    """Add a completed task to the user's daily, weekly and monthly buckets
+
+    Must run inside a transaction that also holds "reportRollups".
+    """
+    day = _parse_day(completed_at) or datetime.utcnow().date()
+    for period in PERIODS:
+        bucket = tx.get(COLLECTION, bucket_id(user_id, period, day))
+        if bucket is None:
+            bucket = _empty_bucket(user_id, period, day)
+            _add_completion(bucket, task, xp)
+            tx.create(COLLECTION, bucket)
+        else:
+            _add_completion(bucket, task, xp)
+            tx.update(COLLECTION, bucket["id"], bucket)
+
+
+def get_bucket(
+    user_id: Any,
+    period: str,
+    day: Optional[date] = None,
+    service: DataService = data_service,
+) -> Dict[str, Any]:
+    """Get a user's bucket containing day (today by default); empty if nothing was completed"""
+    day = day or datetime.utcnow().date()
+    return service.get_by_id(COLLECTION, bucket_id(user_id, period, day)) or _empty_bucket(user_id, period, day)
+
+
+def list_buckets(user_id: Any, period: str, limit: int, service: DataService = data_service) -> List[Dict[str, Any]]:
+    """Get a user's most recent buckets of a period, newest first"""
+    buckets = service.query(COLLECTION, userId=user_id, period=period)
+    buckets.sort(key=lambda bucket: bucket.get("start", ""), reverse=True)
+    return buckets[:limit]
+
+
+def rebuild(service: DataService = data_service) -> int:
+    """Recompute all rollups from the completed tasks; returns the number of buckets
+
+    Tasks are attributed to completedBy (or their assignee) on completedAt (or
+    createdAt); tasks with neither user nor date are skipped.
+    """
+    buckets: Dict[str, Dict[str, Any]] = {}
+    for task in service.query("tasks", status="completed"):
+        user_id = task.get("completedBy", task.get("assigneeId"))
+        day = _parse_day(task.get("completedAt") or task.get("createdAt"))
+        if user_id is None or day is None:
+            continue
+        for period in PERIODS:
+            key = bucket_id(user_id, period, day)
+            if key not in buckets:
+                buckets[key] = _empty_bucket(user_id, period, day)
+            _add_completion(buckets[key], task, task.get("xpReward", 50))
+
+    with service.transaction(COLLECTION) as tx:
+        for bucket in service.get_all(COLLECTION):
+            tx.delete(COLLECTION, bucket["id"])
+        for bucket in buckets.values():
+            tx.create(COLLECTION, bucket)
+    return len(buckets)
+
+
+def ensure_rollups(service: DataService = data_service) -> int:
+    """Build the rollups from the tasks if none have been stored yet"""
+    if service.get_all(COLLECTION):
+        return 0
+    return rebuild(service)
+
+
+def main():
+    """Rebuild the rollups: python -m app.services.report_engine"""
+    count = rebuild()
+    data_service.close()
+    print(f"Rebuilt {count} report buckets")
+
+
+if __name__ == "__main__":
+    main()
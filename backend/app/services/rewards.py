@@ -0,0 +1,112 @@
+import bisect
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.durations import parse_minutes
+
+# Task rewards, as previewed by the Clarify step: a base XP for the estimated time
+# times a difficulty multiplier; gold is worth half the XP. A task that has not
+# been clarified yet is worth the base XP of one hour.
+
+# Base XP by estimated time: below 30 minutes, below 1 hour, below 2 hours, 2 hours and more
+_TIME_THRESHOLDS = (30, 60, 120)
+_TIME_BASE_XP = (10, 20, 50, 100)
+UNCLARIFIED_BASE_XP = 50
+DIFFICULTY_MULTIPLIERS = {"Easy": 1, "Med": 2, "Hard": 4}
+GOLD_PER_XP = 0.5
+
+# Level curve: level 1 takes BASE_LEVEL_XP, every further level LEVEL_XP_GROWTH times
+# the previous one. _CUMULATIVE_XP[i] is the XP needed to get from the start of the
+# curve to step i, so one binary search resolves any number of level-ups.
+BASE_LEVEL_XP = 500
+LEVEL_XP_GROWTH = 1.2
+LEVEL_STEPS = 200
+
+
+def _level_table() -> Tuple[List[int], List[int]]:
+    requirements = [BASE_LEVEL_XP]
+    while len(requirements) < LEVEL_STEPS:
+        requirements.append(int(requirements[-1] * LEVEL_XP_GROWTH))
+    cumulative = [0]
+    for requirement in requirements:
+        cumulative.append(cumulative[-1] + requirement)
+    return requirements, cumulative
+
+
+_LEVEL_XP, _CUMULATIVE_XP = _level_table()
+
+
+def score(difficulty: Optional[str], estimated_time: Optional[str]) -> int:
+    """XP reward for a task of the given difficulty and estimatedTime"""
+    if estimated_time:
+        base = _TIME_BASE_XP[bisect.bisect_right(_TIME_THRESHOLDS, parse_minutes(estimated_time))]
+    else:
+        base = UNCLARIFIED_BASE_XP
+    return base * DIFFICULTY_MULTIPLIERS.get(difficulty, 1)
+
+
+def score_tasks(tasks: Iterable[Dict[str, Any]]) -> List[int]:
+    """XP rewards of many tasks (e.g. a bulk clarify), scoring each distinct difficulty and time once"""
+    scores: Dict[Tuple[Any, Any], int] = {}
+    rewards = []
+    for task in tasks:
+        key = (task.get("difficulty"), task.get("estimatedTime"))
+        if key not in scores:
+            scores[key] = score(*key)
+        rewards.append(scores[key])
+    return rewards
+
+
+def gold_for(xp: int) -> int:
+    """Gold paid out along with an XP reward"""
+    return int(xp * GOLD_PER_XP)
+
+
+def assign(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Set xpReward and goldReward on tasks from their difficulty and estimatedTime; returns tasks"""
+    for task, xp in zip(tasks, score_tasks(tasks)):
+        task["xpReward"] = xp
+        task["goldReward"] = gold_for(xp)
+    return tasks
+
+
+def needs_rescore(changes: Dict[str, Any]) -> bool:
+    """Whether task changes set difficulty or estimatedTime without an explicit xpReward"""
+    return "xpReward" not in changes and ("difficulty" in changes or "estimatedTime" in changes)
+
+
+def rescore_changes(pairs: Iterable[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]):
+    """Add the new rewards to (changes, stored task) pairs whose changes need them, in one batch"""
+    pending = [(changes, task) for changes, task in pairs if needs_rescore(changes)]
+    scores = score_tasks({**(task or {}), **changes} for changes, task in pending)
+    for (changes, _), xp in zip(pending, scores):
+        changes["xpReward"] = xp
+        changes["goldReward"] = gold_for(xp)
+
+
+def completion_reward(task: Dict[str, Any]) -> Tuple[int, int]:
+    """XP and gold for completing a task: its stored rewards, else scored from difficulty and time"""
+    xp = task.get("xpReward") or score(task.get("difficulty"), task.get("estimatedTime"))
+    return xp, task.get("goldReward") or gold_for(xp)
+
+
+def add_xp(user: Dict[str, Any], xp: int) -> Dict[str, int]:
+    """level, currentXP and maxXP of a user after gaining xp, carrying XP over any number of levels
+
+    The user's current level takes their stored maxXP; later levels follow the
+    curve onwards from the step of that maxXP.
+    """
+    level = user.get("level", 1)
+    current = user.get("currentXP", 0) + xp
+    max_xp = user.get("maxXP", BASE_LEVEL_XP)
+    if current < max_xp:
+        return {"level": level, "currentXP": current, "maxXP": max_xp}
+
+    # Finish the current level, then place the rest on the cumulative table
+    step = min(max(bisect.bisect_right(_LEVEL_XP, max_xp) - 1, 0) + 1, LEVEL_STEPS - 1)
+    total = _CUMULATIVE_XP[step] + current - max_xp
+    reached = min(bisect.bisect_right(_CUMULATIVE_XP, total) - 1, LEVEL_STEPS - 1)
+    return {
+        "level": level + 1 + reached - step,
+        "currentXP": total - _CUMULATIVE_XP[reached],
+        "maxXP": _LEVEL_XP[reached],
+    }
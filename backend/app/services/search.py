@@ -0,0 +1,180 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.data_service import DataService, data_service
+from app.services.storage import normalize_id
+
+# Full-text search over task titles, descriptions and subtask texts.
+# Latin words are indexed whole (and matched by prefix); CJK runs, which have
+# no spaces, are indexed as single characters plus overlapping bigrams.
+
+# Han (incl. extension A and compatibility ideographs), kana and hangul
+_CJK_CHARS = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"
+_TOKEN_PATTERN = re.compile(rf"[{_CJK_CHARS}]+|[^\W_]+")
+_CJK_PATTERN = re.compile(rf"[{_CJK_CHARS}]")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Weight of a term matched only by prefix, relative to an exact match
+PREFIX_WEIGHT = 0.5
+# Most index terms a single query word may expand to by prefix
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into index terms: lowercased words, CJK unigrams and bigrams"""
+    tokens: List[str] = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if _CJK_PATTERN.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def task_text(task: Dict[str, Any]) -> str:
+    """The searchable text of a task"""
+    parts = [task.get("title") or "", task.get("description") or ""]
+    for subtask in task.get("subtasks") or []:
+        if isinstance(subtask, dict):
+            parts.append(subtask.get("text") or "")
+    return "\n".join(parts)
+
+
+class SearchIndex:
+    """In-memory inverted index over the tasks collection with BM25 ranking
+
+    Built on first search and kept up to date by a DataService write hook;
+    rebuilt when the tasks change in a way the hook did not see (reload from disk).
+    """
+
+    def __init__(self, service: DataService = data_service, collection: str = "tasks"):
+        self.service = service
+        self.collection = collection
+        self._lock = threading.RLock()
+        self._built = False
+        self._version: Optional[int] = None
+        # term -> {doc key: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # doc key -> term counts of the doc, for removal
+        self._docs: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        # Every term, sorted, for prefix lookups
+        self._terms: List[str] = []
+
+    def _add(self, key: str, task: Dict[str, Any], keep_sorted: bool = True):
+        counts = Counter(tokenize(task_text(task)))
+        self._docs[key] = counts
+        length = sum(counts.values())
+        self._doc_lengths[key] = length
+        self._total_length += length
+        for term, frequency in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if keep_sorted:
+                    bisect.insort(self._terms, term)
+            postings[key] = frequency
+
+    def _remove(self, key: str):
+        counts = self._docs.pop(key, None)
+        if counts is None:
+            return
+        self._total_length -= self._doc_lengths.pop(key, 0)
+        for term in counts:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                at = bisect.bisect_left(self._terms, term)
+                if at < len(self._terms) and self._terms[at] == term:
+                    del self._terms[at]
+
+    def rebuild(self):
+        """Index every task from scratch"""
+        with self._lock:
+            self._postings.clear()
+            self._docs.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0
+            self._terms = []
+            self._version = self.service.version(self.collection)
+            for task in self.service.get_all(self.collection):
+                if task.get("id") is not None:
+                    self._add(normalize_id(task["id"]), task, keep_sorted=False)
+            self._terms = sorted(self._postings)
+            self._built = True
+
+    def on_write(self, collection: str, op: str, item_id: Any, item: Optional[Dict[str, Any]]):
+        """DataService write hook: apply one change to the index"""
+        if collection != self.collection:
+            return
+        with self._lock:
+            if not self._built:
+                # Nothing to maintain until the first search builds the index
+                return
+            key = normalize_id(item_id)
+            self._remove(key)
+            if op != "delete" and item is not None:
+                self._add(normalize_id(item.get("id", item_id)), item)
+            self._version = self.service.version(self.collection, refresh=False)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Index terms matching a query token, with their weights"""
+        matches = [(token, 1.0)] if token in self._postings else []
+        if not _CJK_PATTERN.match(token):
+            start = bisect.bisect_left(self._terms, token)
+            for term in self._terms[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    matches.append((term, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """Rank tasks against a query; returns (doc key, score) pairs, best first"""
+        with self._lock:
+            if not self._built or self._version != self.service.version(self.collection):
+                self.rebuild()
+            doc_count = len(self._docs)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count or 1
+            scores: Dict[str, float] = {}
+            for token in set(tokenize(query)):
+                for term, weight in self._expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for key, frequency in postings.items():
+                        length_norm = 1 - B + B * self._doc_lengths[key] / average_length
+                        scores[key] = scores.get(key, 0.0) + weight * idf * (
+                            frequency * (K1 + 1) / (frequency + K1 * length_norm)
+                        )
+        return sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+
+
+_derived_lock = threading.Lock()
+
+
+def index_for(service: DataService) -> SearchIndex:
+    """The search index over a service's tasks (one per shard), created on first use"""
+    with _derived_lock:
+        index = service.derived.get("search")
+        if index is None:
+            index = service.derived["search"] = SearchIndex(service)
+            service.add_write_hook(index.on_write)
+    return index
+
+
+task_index = SearchIndex()
+data_service.derived["search"] = task_index
+data_service.add_write_hook(task_index.on_write)
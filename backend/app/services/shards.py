@@ -0,0 +1,277 @@
+"""Per-owner shards of the partitioned collections.
+
+With CORETERRA_SHARD_BY=user (or team) every owner's tasks, calendar events,
+reports and report rollups live in their own directory under SHARD_DIR, as
+JSON files or a SQLite database like the shared store. Routers get the
+current user's shard from get_user_store; a write to one shard never
+rewrites another owner's files.
+
+Existing data can be split into shards once (from the backend directory):
+    CORETERRA_SHARD_BY=user python -m app.services.shards split [--default-user 1]
+
+The project counters are kept up to date by every task write. After changing
+shard files outside the API, recompute them from every shard's tasks with:
+    CORETERRA_SHARD_BY=user python -m app.services.shards rebuild-projects
+"""
+import argparse
+import asyncio
+import functools
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app import config
+from app.services import project_stats, report_engine
+from app.services.data_service import DataService, create_configured_backend, data_service
+from app.services.storage import COLLECTION_FILES, PARTITIONED_COLLECTIONS, RoutedStorage, snapshot
+
+SHARD_MODES = ("none", "user", "team")
+
+# Called after every write to a shard's partitioned collections as
+# hook(shard_key, collection, op, item_id, item)
+ShardWriteHook = Callable[[str, str, str, Any, Optional[Dict[str, Any]]], None]
+
+_UNSAFE_KEY_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class ShardService(DataService):
+    """DataService over one shard
+
+    Partitioned collections come from the shard's own backend, with their own
+    locks, versions and write hooks. Every other collection is served, locked,
+    versioned and hooked by the parent service, so shards share one view of it.
+    """
+
+    def __init__(self, parent: DataService, key: str, data_dir: Path, backend):
+        self.parent = parent
+        self.key = key
+        self.partitioned = frozenset(PARTITIONED_COLLECTIONS)
+        super().__init__(data_dir=str(data_dir), backend=RoutedStorage(parent.backend, backend, self.partitioned))
+
+    def _collection_lock(self, collection: str) -> threading.RLock:
+        if collection in self.partitioned:
+            return super()._collection_lock(collection)
+        return self.parent._collection_lock(collection)
+
+    def _file_lock(self, collection: str) -> asyncio.Lock:
+        if collection in self.partitioned:
+            return super()._file_lock(collection)
+        return self.parent._file_lock(collection)
+
+    def version(self, collection: str, refresh: bool = True) -> int:
+        if collection in self.partitioned:
+            return super().version(collection, refresh)
+        return self.parent.version(collection, refresh)
+
+    def _notify(self, collection: str, op: str, item_id: Any, item: Optional[Dict[str, Any]]):
+        if collection in self.partitioned:
+            super()._notify(collection, op, item_id, item)
+        else:
+            self.parent._notify(collection, op, item_id, item)
+
+
+class ShardManager:
+    """Opens shards on first use and keeps the max_open most recently used ones"""
+
+    def __init__(
+        self,
+        root: DataService = data_service,
+        shard_by: str = config.SHARD_BY,
+        shard_dir: Optional[str] = None,
+        max_open: int = config.SHARD_MAX_OPEN,
+    ):
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode: {shard_by}")
+        self.root = root
+        self.shard_by = shard_by
+        # Relative to the backend project root, like DATA_DIR
+        self.shard_dir = Path(__file__).parent.parent.parent / (shard_dir or config.SHARD_DIR)
+        self.max_open = max(1, max_open)
+        self._open: "OrderedDict[str, ShardService]" = OrderedDict()
+        # Evicted shards that are still referenced (e.g. by in-flight requests); reused
+        # instead of loading a second copy of the same files
+        self._evicted: "weakref.WeakValueDictionary[str, ShardService]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        # Per-key locks so a shard is loaded once without blocking lookups of other shards
+        self._loading: Dict[str, threading.Lock] = {}
+        self._write_hooks: List[ShardWriteHook] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.shard_by != "none"
+
+    def key_for(self, user_id: Any) -> str:
+        """Shard key of a user: their team (team mode, if they have one) or themselves"""
+        if self.shard_by == "team":
+            user = self.root.get_by_id("users", user_id)
+            team_id = user.get("teamId") if user else None
+            if team_id is not None:
+                return _UNSAFE_KEY_CHARS.sub("_", f"team-{team_id}")
+        return _UNSAFE_KEY_CHARS.sub("_", f"user-{user_id}")
+
+    def for_user(self, current_user: Dict[str, Any]) -> DataService:
+        """The service holding a user's data: their shard, or the shared service when sharding is off"""
+        if not self.enabled:
+            return self.root
+        return self.get(self.key_for(current_user["user_id"]))
+
+    def _lookup(self, key: str, evicted: List[ShardService]) -> Optional[ShardService]:
+        """Find an open or still referenced shard; call with self._lock held"""
+        shard = self._open.get(key)
+        if shard is not None:
+            self._open.move_to_end(key)
+            return shard
+        shard = self._evicted.pop(key, None)
+        if shard is not None:
+            self._insert(key, shard, evicted)
+        return shard
+
+    def _insert(self, key: str, shard: ShardService, evicted: List[ShardService]):
+        """Mark a shard open, collecting the least recently used ones beyond max_open; call with self._lock held"""
+        self._open[key] = shard
+        while len(self._open) > self.max_open:
+            old_key, old = self._open.popitem(last=False)
+            self._evicted[old_key] = old
+            evicted.append(old)
+
+    def get(self, key: str) -> ShardService:
+        """Get a shard, loading it from disk (or creating it empty) if it is not open"""
+        evicted: List[ShardService] = []
+        with self._lock:
+            shard = self._lookup(key, evicted)
+            if shard is None:
+                loading = self._loading.setdefault(key, threading.Lock())
+        if shard is None:
+            with loading:
+                with self._lock:
+                    shard = self._lookup(key, evicted)
+                if shard is None:
+                    shard = self._load(key)
+                    with self._lock:
+                        self._insert(key, shard, evicted)
+                        self._loading.pop(key, None)
+        # Evicted shards are flushed now and closed once no request holds them any more
+        for old in evicted:
+            old.flush()
+        return shard
+
+    def _load(self, key: str) -> ShardService:
+        shard_dir = self.shard_dir / key
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        backend = create_configured_backend(
+            shard_dir, shard_dir / "coreterra.sqlite3", collections=PARTITIONED_COLLECTIONS
+        )
+        shard = ShardService(self.root, key, shard_dir, backend)
+        weakref.finalize(shard, backend.close)
+        for hook in self._write_hooks:
+            shard.add_write_hook(functools.partial(hook, key))
+        report_engine.ensure_rollups(shard)
+        return shard
+
+    def add_write_hook(self, hook: ShardWriteHook):
+        """Register a function called after every write to any shard's partitioned collections"""
+        with self._lock:
+            self._write_hooks.append(hook)
+            shards = list(self._open.items()) + list(self._evicted.items())
+        for key, shard in shards:
+            shard.add_write_hook(functools.partial(hook, key))
+
+    def keys(self) -> List[str]:
+        """Keys of every shard on disk"""
+        if not self.shard_dir.is_dir():
+            return []
+        return sorted(path.name for path in self.shard_dir.iterdir() if path.is_dir())
+
+    def each(self) -> Iterator[ShardService]:
+        """Every shard on disk, opened one at a time (beyond max_open, earlier ones get evicted)"""
+        for key in self.keys():
+            yield self.get(key)
+
+    def open_keys(self) -> List[str]:
+        """Keys of the open shards, least recently used first"""
+        with self._lock:
+            return list(self._open)
+
+    def close(self):
+        """Flush and close every shard still in memory"""
+        with self._lock:
+            shards = list(self._open.values()) + list(self._evicted.values())
+            self._open.clear()
+            self._evicted.clear()
+        for shard in shards:
+            shard.close()
+
+
+shard_manager = ShardManager()
+
+
+def _owner(item: Dict[str, Any], default_user: int) -> Any:
+    for field in ("ownerId", "userId", "completedBy"):
+        if item.get(field) is not None:
+            return item[field]
+    return default_user
+
+
+def split(manager: ShardManager, data_dir: Path, default_user: int) -> Dict[str, Dict[str, int]]:
+    """Write the partitioned collections of the data files in data_dir into per-owner shard files
+
+    Items are assigned by ownerId, userId or completedBy, else to default_user.
+    Returns the number of items per shard and collection.
+    """
+    shard_files: Dict[str, Dict[str, Dict[str, List[Dict[str, Any]]]]] = {}
+    counts: Dict[str, Dict[str, int]] = {}
+    for collection in PARTITIONED_COLLECTIONS:
+        filename = COLLECTION_FILES[collection]
+        items = snapshot.read(data_dir, filename, config.SNAPSHOT_FORMAT).get(collection, [])
+        for item in items:
+            key = manager.key_for(_owner(item, default_user))
+            shard_files.setdefault(key, {}).setdefault(filename, {}).setdefault(collection, []).append(item)
+            counts.setdefault(key, {}).setdefault(collection, 0)
+            counts[key][collection] += 1
+
+    for key, files in shard_files.items():
+        shard_dir = manager.shard_dir / key
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        for filename, file_data in files.items():
+            payload = snapshot.encode(file_data, config.SNAPSHOT_FORMAT)
+            snapshot.write(shard_dir / snapshot.snapshot_name(filename, config.SNAPSHOT_FORMAT), payload)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage per-owner data shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split_parser = commands.add_parser("split", help="Split the shared data files into shards")
+    split_parser.add_argument("--default-user", type=int, default=1, help="Owner of items that name none")
+    split_parser.add_argument("--force", action="store_true", help="Overwrite existing shard files")
+    commands.add_parser("list", help="List the shards on disk")
+    commands.add_parser("rebuild-projects", help="Recompute the project counters from every shard's tasks")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for key in shard_manager.keys():
+            print(key)
+        return
+
+    if not shard_manager.enabled:
+        parser.error("set CORETERRA_SHARD_BY to user or team first")
+    if args.command == "rebuild-projects":
+        # Shards are opened before the projects are locked: a shard's write lock is taken first
+        changed = project_stats.rebuild(task_sources=list(shard_manager.each()))
+        shard_manager.close()
+        data_service.close()
+        print(f"{changed} projects updated")
+        return
+    if shard_manager.keys() and not args.force:
+        parser.error(f"{shard_manager.shard_dir} already holds shards (use --force to overwrite)")
+    counts = split(shard_manager, data_service.data_dir, args.default_user)
+    for key, collections in sorted(counts.items()):
+        summary = ", ".join(f"{collection}: {count}" for collection, count in collections.items())
+        print(f"{key}: {summary}")
+
+
+if __name__ == "__main__":
+    main()
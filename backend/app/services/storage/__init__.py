@@ -0,0 +1,50 @@
+# Storage backends
+
+from pathlib import Path
+from typing import Any, Optional
+
+from app.services.storage.base import COLLECTION_FILES, PARTITIONED_COLLECTIONS, StorageBackend, normalize_id
+from app.services.storage.json_store import JsonStorage
+from app.services.storage.routed import RoutedStorage
+from app.services.storage.sqlite_store import SqliteStorage
+
+
+def create_backend(
+    kind: str,
+    data_dir: Path,
+    sqlite_path: Optional[Path] = None,
+    multiprocess: bool = False,
+    **json_options: Any,
+) -> StorageBackend:
+    """Create the storage backend named by kind ("json" or "sqlite")
+
+    multiprocess makes the backend safe to share between worker processes.
+    json_options are passed to JsonStorage (e.g. write_behind, flush_interval).
+    """
+    if kind == "json":
+        return JsonStorage(data_dir, multiprocess=multiprocess, **json_options)
+    if kind == "sqlite":
+        db_path = Path(sqlite_path) if sqlite_path else Path(data_dir) / "coreterra.sqlite3"
+        is_new = not db_path.exists()
+        storage = SqliteStorage(db_path, multiprocess=multiprocess)
+        # Seed a fresh database from the JSON files (once, if several processes start together)
+        if is_new:
+            from app.services.storage.importer import import_json_files
+
+            with storage.exclusive():
+                if not any(storage.page(collection, 1) for collection in COLLECTION_FILES):
+                    import_json_files(storage, data_dir)
+        return storage
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+__all__ = [
+    "COLLECTION_FILES",
+    "PARTITIONED_COLLECTIONS",
+    "StorageBackend",
+    "JsonStorage",
+    "RoutedStorage",
+    "SqliteStorage",
+    "create_backend",
+    "normalize_id",
+]
@@ -0,0 +1,139 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services import metrics
+
+
+# Map collections to the JSON files they are stored in
+COLLECTION_FILES: Dict[str, str] = {
+    "users": "mock_users.json",
+    "authCredentials": "mock_users.json",
+    "tasks": "mock_tasks.json",
+    "calendarEvents": "mock_tasks.json",
+    "projects": "mock_projects.json",
+    "shopItems": "mock_items.json",
+    "achievements": "mock_achievements.json",
+    "teams": "mock_teams.json",
+    "contexts": "mock_contexts.json",
+    "scheduledCategories": "mock_contexts.json",
+    "reports": "mock_report.json",
+    "reportRollups": "mock_report.json",
+}
+
+# Collections kept per owner (user or team) when sharding is enabled, see app/services/shards.py
+PARTITIONED_COLLECTIONS: Tuple[str, ...] = ("tasks", "calendarEvents", "reports", "reportRollups")
+
+# Fields that get a secondary index, per collection
+INDEXED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "tasks": ("status", "projectId", "assigneeId", "contextId"),
+}
+
+
+def normalize_id(item_id: Any) -> str:
+    """Normalize an ID (or indexed field value) so that int and str forms map to the same key"""
+    return str(item_id)
+
+
+def id_sort_key(item_id: Any) -> Tuple[int, Any]:
+    """Sort key giving a stable order by ID: integer IDs first, numerically, then the rest as text"""
+    if isinstance(item_id, int) and not isinstance(item_id, bool):
+        return (0, item_id)
+    return (1, normalize_id(item_id))
+
+
+def matches_filters(item: Dict[str, Any], expected: Dict[str, str]) -> bool:
+    """Check an item against normalized field values"""
+    return all(normalize_id(item.get(field)) == value for field, value in expected.items())
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every storage engine behind DataService"""
+
+    # Called with a collection name when its data is reloaded from outside changes
+    reload_listener: Optional[Callable[[str], None]] = None
+
+    @abstractmethod
+    def get_all(self, collection: str) -> List[Dict[str, Any]]:
+        """Get all items from a collection"""
+
+    @abstractmethod
+    def get_by_id(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        """Get an item by ID from a collection"""
+
+    @abstractmethod
+    def create(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new item in a collection"""
+
+    @abstractmethod
+    def update(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an item in a collection"""
+
+    @abstractmethod
+    def delete(self, collection: str, item_id: Any) -> bool:
+        """Delete an item from a collection"""
+
+    def filter(self, collection: str, predicate: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+        """Filter items in a collection"""
+        items = self.get_all(collection)
+        metrics.STORAGE_SCAN_LENGTH.observe(len(items), collection=collection, lookup="filter")
+        return [item for item in items if predicate(item)]
+
+    def query(self, collection: str, **filters: Any) -> List[Dict[str, Any]]:
+        """Get the items whose fields equal the given values; None values are ignored"""
+        expected = {field: normalize_id(value) for field, value in filters.items() if value is not None}
+        items = self.get_all(collection)
+        metrics.STORAGE_SCAN_LENGTH.observe(len(items), collection=collection, lookup="query")
+        return [item for item in items if matches_filters(item, expected)]
+
+    def page(
+        self,
+        collection: str,
+        limit: int,
+        after: Any = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Get up to limit items ordered by ID, starting after the given ID"""
+        items = self.query(collection, **filters)
+        if after is not None:
+            after_key = id_sort_key(after)
+            items = [item for item in items if id_sort_key(item.get("id")) > after_key]
+        items.sort(key=lambda item: id_sort_key(item.get("id")))
+        return items[:limit]
+
+    def get_auth_credentials(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get authentication credentials for a username"""
+        credentials = self.get_all("authCredentials")
+        for scanned, cred in enumerate(credentials, 1):
+            if cred.get("username") == username:
+                metrics.STORAGE_SCAN_LENGTH.observe(scanned, collection="authCredentials", lookup="credentials")
+                return cred
+        metrics.STORAGE_SCAN_LENGTH.observe(len(credentials), collection="authCredentials", lookup="credentials")
+        return None
+
+    def refresh(self, collection: str):
+        """Pick up outside changes to a collection, as a read would (no-op by default)"""
+
+    @contextmanager
+    def exclusive(self):
+        """Keep writers in other processes out for the block, e.g. around a read-modify-write.
+
+        Engines shared between worker processes lock here and catch up with
+        the other processes' changes first; the default does nothing.
+        """
+        yield
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations into one unit that is persisted once.
+
+        Engines that can write atomically do so; the default applies each
+        mutation on its own.
+        """
+        yield
+
+    def flush(self):
+        """Write any buffered changes to durable storage"""
+
+    def close(self):
+        """Release any resources held by the backend"""
@@ -0,0 +1,29 @@
+"""Convert the JSON engine's data files between snapshot formats (see snapshot.py).
+
+Usage (from the backend directory):
+    python -m app.services.storage.convert --to msgpack [--from json] [--data-dir data]
+"""
+import argparse
+from pathlib import Path
+
+from app.services.storage.snapshot import SNAPSHOT_FORMATS, convert, snapshot_name
+
+
+def main():
+    root_dir = Path(__file__).parent.parent.parent.parent
+    parser = argparse.ArgumentParser(description="Convert data files between snapshot formats")
+    parser.add_argument("--to", required=True, choices=SNAPSHOT_FORMATS, help="Target format")
+    parser.add_argument("--from", dest="source", default="json", choices=SNAPSHOT_FORMATS, help="Source format")
+    parser.add_argument("--data-dir", default=str(root_dir / "data"), help="Directory holding the data files")
+    args = parser.parse_args()
+
+    try:
+        sizes = convert(Path(args.data_dir), args.source, args.to)
+    except ValueError as e:
+        parser.error(str(e))
+    for filename, (before, after) in sizes.items():
+        print(f"{snapshot_name(filename, args.source)} -> {snapshot_name(filename, args.to)}: {before} -> {after} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+_EVENT_HEADER = struct.Struct("iIII")
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def _load_inotify():
+    """Get libc if it provides inotify (Linux only), otherwise None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Background thread that reports changes to a set of files in one directory.
+
+    Uses inotify on Linux and falls back to polling modification times
+    every poll_interval seconds elsewhere (or when inotify is unavailable).
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        filenames: Iterable[str],
+        on_change: Callable[[str], None],
+        poll_interval: float = 1.0,
+    ):
+        self.directory = Path(directory)
+        self.filenames = set(filenames)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.mode: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+        self._mtimes: Dict[str, float] = {}
+
+    def start(self):
+        """Start watching, preferring inotify over polling"""
+        libc = _load_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0 and libc.inotify_add_watch(fd, str(self.directory).encode(), _WATCH_MASK) >= 0:
+                self._fd = fd
+                self.mode = "inotify"
+            else:
+                if fd >= 0:
+                    os.close(fd)
+                logger.warning("inotify unavailable (errno %d), polling %s instead", ctypes.get_errno(), self.directory)
+        if self.mode is None:
+            self.mode = "poll"
+            # Snapshot before the thread starts so changes made right after start() are seen
+            self._mtimes = self._read_mtimes()
+
+        target = self._inotify_loop if self.mode == "inotify" else self._poll_loop
+        self._thread = threading.Thread(target=target, name="json-storage-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _inotify_loop(self):
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([self._fd], [], [], self.poll_interval)
+            if not readable:
+                continue
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                _, _, _, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + name_len].rstrip(b"\0").decode(errors="replace")
+                offset += name_len
+                if name in self.filenames:
+                    self.on_change(name)
+
+    def _read_mtimes(self) -> Dict[str, float]:
+        mtimes: Dict[str, float] = {}
+        for filename in self.filenames:
+            path = self.directory / filename
+            if path.exists():
+                mtimes[filename] = os.path.getmtime(path)
+        return mtimes
+
+    def _poll_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            for filename, mtime in self._read_mtimes().items():
+                if self._mtimes.get(filename) != mtime:
+                    self._mtimes[filename] = mtime
+                    self.on_change(filename)
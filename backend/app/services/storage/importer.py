@@ -0,0 +1,50 @@
+"""One-shot importer that loads the mock_*.json files into a SQLite database.
+
+Usage (from the backend directory):
+    python -m app.services.storage.importer [--data-dir data] [--db data/coreterra.sqlite3]
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict
+
+from app.services.storage.base import COLLECTION_FILES
+from app.services.storage.sqlite_store import SqliteStorage
+
+
+def import_json_files(storage: SqliteStorage, data_dir: Path) -> Dict[str, int]:
+    """Load every collection from the JSON files in data_dir, returning row counts"""
+    data_dir = Path(data_dir)
+    loaded_files: Dict[str, Dict] = {}
+    counts: Dict[str, int] = {}
+    for collection, filename in COLLECTION_FILES.items():
+        if filename not in loaded_files:
+            file_path = data_dir / filename
+            if file_path.exists():
+                with open(file_path, "r", encoding="utf-8") as f:
+                    loaded_files[filename] = json.load(f)
+            else:
+                loaded_files[filename] = {}
+        items = loaded_files[filename].get(collection, [])
+        counts[collection] = storage.replace_collection(collection, items)
+    return counts
+
+
+def main():
+    root_dir = Path(__file__).parent.parent.parent.parent
+    parser = argparse.ArgumentParser(description="Import mock_*.json files into a SQLite database")
+    parser.add_argument("--data-dir", default=str(root_dir / "data"), help="Directory holding mock_*.json")
+    parser.add_argument("--db", default=str(root_dir / "data" / "coreterra.sqlite3"), help="SQLite database path")
+    args = parser.parse_args()
+
+    storage = SqliteStorage(Path(args.db))
+    try:
+        counts = import_json_files(storage, Path(args.data_dir))
+    finally:
+        storage.close()
+    for collection, count in counts.items():
+        print(f"{collection}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,823 @@
+import bisect
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, List, MutableMapping, Optional, Set, Tuple
+
+from app.services import metrics
+from app.services.storage.base import (
+    COLLECTION_FILES,
+    INDEXED_FIELDS,
+    StorageBackend,
+    id_sort_key,
+    matches_filters,
+    normalize_id,
+)
+from app.services.storage.file_watcher import FileWatcher
+from app.services.storage.multiprocess import ChangeSequence, FileLock
+from app.services.storage import snapshot
+
+logger = logging.getLogger(__name__)
+
+# How _check_and_reload_file decides whether to look at the disk:
+#   always  - stat the file on every read
+#   ttl     - stat a file at most once per reload_ttl seconds
+#   inotify - a watcher thread marks changed files stale (polling where inotify is unavailable)
+#   never   - the process owns the files; never reload
+RELOAD_POLICIES = ("always", "ttl", "inotify", "never")
+
+
+def _add_to_indexes(indexes: Dict[str, Dict[str, Set[str]]], item: Dict[str, Any]):
+    """Add an item to a collection's secondary indexes (field -> value -> ids)"""
+    key = normalize_id(item.get("id"))
+    for field, values in indexes.items():
+        values.setdefault(normalize_id(item.get(field)), set()).add(key)
+
+
+class JsonStorage(StorageBackend):
+    """Storage engine that keeps whole JSON files in memory and rewrites them on change"""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        write_behind: bool = False,
+        flush_interval: float = 1.0,
+        flush_max_dirty: int = 100,
+        journal: bool = False,
+        journal_max_bytes: int = 1024 * 1024,
+        reload_policy: str = "always",
+        reload_ttl: float = 1.0,
+        collections: Optional[Iterable[str]] = None,
+        multiprocess: bool = False,
+        snapshot_format: str = "json",
+        lazy: bool = False,
+    ):
+        if reload_policy not in RELOAD_POLICIES:
+            raise ValueError(f"Unknown reload policy: {reload_policy}")
+        snapshot.check_format(snapshot_format, lazy)
+        if multiprocess and (write_behind or journal):
+            raise ValueError("Multi-process mode needs write-behind and journal mode off")
+        self.data_dir = Path(data_dir)
+
+        # Map collections to their JSON files (only the given collections, if any)
+        self._file_map = dict(COLLECTION_FILES)
+        if collections is not None:
+            self._file_map = {name: self._file_map[name] for name in collections}
+
+        # On-disk format of the data files (see snapshot.py); lazy decodes collections on first use
+        self.snapshot_format = snapshot_format
+        self.lazy = lazy
+
+        # Cache for loaded data
+        self._data_cache: Dict[str, MutableMapping[str, Any]] = {}
+        # Cache for file modification times
+        self._file_mtimes: Dict[str, float] = {}
+        # Primary-key index: collection -> {normalized id: position in the collection list}
+        self._id_index: Dict[str, Dict[str, int]] = {}
+        # Highest integer ID per collection, for auto-generated IDs
+        self._max_ids: Dict[str, int] = {}
+        # Secondary indexes: collection -> field -> normalized value -> ids of matching items
+        self._field_indexes: Dict[str, Dict[str, Dict[str, Set[str]]]] = {}
+        # Distinct ID sort keys per collection, kept sorted for paging by ID
+        self._sorted_keys: Dict[str, List[Tuple[int, Any]]] = {}
+        # Credentials: username -> position, rebuilt after any change to them
+        self._username_index: Optional[Dict[str, int]] = None
+
+        # Guards the cache against the write-behind flusher thread
+        self._lock = threading.RLock()
+        # Serializes writes to disk so an older snapshot never overwrites a newer one
+        self._flush_lock = threading.Lock()
+        # Files changed inside the current batch(), persisted once it ends
+        self._batch_depth = 0
+        self._batch_files: Set[str] = set()
+        # Write-behind mode: filename -> number of mutations not yet written to disk
+        self._dirty: Dict[str, int] = {}
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_max_dirty = flush_max_dirty
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # Journal mode: mutations are appended to <file>.journal and folded into
+        # the snapshot once the journal grows past journal_max_bytes
+        self.journal = journal
+        self.journal_max_bytes = journal_max_bytes
+        self._journal_files: Dict[str, IO[str]] = {}
+        self._journal_sizes: Dict[str, int] = {}
+        # Reload policy state: last check time per file (ttl) and files flagged by the watcher (inotify)
+        self.reload_policy = reload_policy
+        self.reload_ttl = reload_ttl
+        self._last_checked: Dict[str, float] = {}
+        self._stale_files: Set[str] = set()
+        self._watcher: Optional[FileWatcher] = None
+        # Multi-process mode: writes hold a lock file shared with the other worker
+        # processes and bump a shared change sequence, which replaces the reload
+        # policy in telling each process which files to reload
+        self._process_lock: Optional[FileLock] = None
+        self._sequence: Optional[ChangeSequence] = None
+        if multiprocess:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            self._process_lock = FileLock(self.data_dir / ".json_storage.lock")
+            self._sequence = ChangeSequence(self.data_dir / ".json_storage.seq", self._process_lock)
+
+        self._load_all_data()
+        self._cache_file_mtimes()
+        if not journal:
+            # Fold journals left behind by an earlier journal-mode run into the snapshots
+            with self.exclusive():
+                self.compact()
+        if write_behind:
+            self._flusher = threading.Thread(target=self._flush_loop, name="json-storage-flusher", daemon=True)
+            self._flusher.start()
+        if reload_policy == "inotify":
+            # The watcher reports snapshot file names; map them back to data files
+            watched = {self._snapshot_path(filename).name: filename for filename in set(self._file_map.values())}
+            self._watcher = FileWatcher(
+                self.data_dir,
+                set(watched),
+                lambda name: self._stale_files.add(watched.get(name, name)),
+                poll_interval=reload_ttl,
+            )
+            self._watcher.start()
+
+    def _get_file_path(self, collection: str) -> Path:
+        """Get the file path for a collection"""
+        filename = self._file_map.get(collection)
+        if not filename:
+            raise ValueError(f"Unknown collection: {collection}")
+        return self.data_dir / filename
+
+    def _snapshot_path(self, filename: str) -> Path:
+        """Path of a data file's snapshot in the configured format"""
+        return self.data_dir / snapshot.snapshot_name(filename, self.snapshot_format)
+
+    def _load_file(self, filename: str) -> MutableMapping[str, Any]:
+        """Load data from a snapshot file (falling back to the JSON file before the first save)"""
+        data = snapshot.read(self.data_dir, filename, self.snapshot_format, self.lazy)
+        # Replay logged mutations on top of the last snapshot
+        self._replay_journal(filename, data)
+        return data
+
+    def _journal_path(self, filename: str, rotated: bool = False) -> Path:
+        """Get the journal path of a data file; the rotated journal is being compacted"""
+        return self.data_dir / (f"{filename}.journal.old" if rotated else f"{filename}.journal")
+
+    def _append_journal(self, collection: str, op: str, item_id: Any, data: Optional[Dict[str, Any]] = None):
+        """Durably append one mutation record to the journal of a collection's file"""
+        filename = self._file_map[collection]
+        record = {"op": op, "collection": collection, "id": item_id}
+        if data is not None:
+            record["data"] = data
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        journal_file = self._journal_files.get(filename)
+        if journal_file is None:
+            path = self._journal_path(filename)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            journal_file = open(path, "a", encoding="utf-8")
+            self._journal_files[filename] = journal_file
+        journal_file.write(line)
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+        self._journal_sizes[filename] = self._journal_sizes.get(filename, 0) + len(line.encode("utf-8"))
+
+    def _replay_journal(self, filename: str, data: MutableMapping[str, Any]):
+        """Apply the rotated and current journals of a file to its snapshot data"""
+        size = 0
+        for path in (self._journal_path(filename, rotated=True), self._journal_path(filename)):
+            if not path.exists():
+                continue
+            positions: Dict[str, Dict[str, int]] = {}
+            valid_bytes = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final record from a crash mid-append; everything before it is intact
+                        logger.warning("Dropping truncated record at byte %d of %s", valid_bytes, path)
+                        break
+                    self._apply_journal_record(data, record, positions)
+                    valid_bytes += len(line)
+            if valid_bytes < path.stat().st_size:
+                # Cut the torn tail so new records are not appended onto it
+                os.truncate(path, valid_bytes)
+            size += valid_bytes
+        self._journal_sizes[filename] = size
+
+    @staticmethod
+    def _apply_journal_record(
+        data: MutableMapping[str, Any],
+        record: Dict[str, Any],
+        positions: Dict[str, Dict[str, int]],
+    ):
+        """Apply one journal record; replay is idempotent, so a record may be applied twice"""
+        collection = record["collection"]
+        items = data.setdefault(collection, [])
+        index = positions.get(collection)
+        if index is None:
+            index = {}
+            for position, item in enumerate(items):
+                index.setdefault(normalize_id(item.get("id")), position)
+            positions[collection] = index
+
+        key = normalize_id(record.get("id"))
+        position = index.get(key)
+        op = record["op"]
+        if op == "create":
+            if position is None:
+                items.append(record["data"])
+                index[key] = len(items) - 1
+            else:
+                items[position] = record["data"]
+        elif op == "update":
+            if position is not None:
+                items[position] = {**items[position], **record["data"]}
+                if normalize_id(items[position].get("id")) != key:
+                    positions.pop(collection)
+        elif op == "delete":
+            if position is not None:
+                items.pop(position)
+                positions.pop(collection)
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def _rotate_journal(self, filename: str):
+        """Move the current journal aside so new records start a fresh one"""
+        journal_file = self._journal_files.pop(filename, None)
+        if journal_file is not None:
+            journal_file.close()
+        current = self._journal_path(filename)
+        rotated = self._journal_path(filename, rotated=True)
+        if not current.exists():
+            return
+        if rotated.exists():
+            # An earlier compaction did not finish; keep its records too
+            with open(rotated, "a", encoding="utf-8") as dst, open(current, "r", encoding="utf-8") as src:
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            current.unlink()
+        else:
+            os.replace(current, rotated)
+        self._journal_sizes[filename] = 0
+
+    def _serialize(self, filename: str, data: MutableMapping[str, Any]) -> bytes:
+        """Serialize file data in the snapshot format"""
+        started = time.perf_counter()
+        payload = snapshot.encode(data, self.snapshot_format)
+        metrics.STORAGE_SERIALIZE_SECONDS.observe(time.perf_counter() - started, file=filename)
+        return payload
+
+    def _write_file(self, filename: str, payload: bytes):
+        """Atomically replace a data file: write a temp file, then os.replace it into place"""
+        file_path = self._snapshot_path(filename)
+        started = time.perf_counter()
+        snapshot.write(file_path, payload)
+        stat = os.stat(file_path)
+        self._file_mtimes[filename] = stat.st_mtime
+        metrics.STORAGE_SAVE_SECONDS.observe(time.perf_counter() - started, file=filename)
+        metrics.STORAGE_SAVE_BYTES.inc(stat.st_size, file=filename)
+
+    def _save_file(self, filename: str, data: MutableMapping[str, Any]):
+        """Save data to its snapshot file"""
+        with self._flush_lock:
+            self._write_file(filename, self._serialize(filename, data))
+
+    def _load_all_data(self):
+        """Load all data files into cache"""
+        # Load each unique file once
+        loaded_files = {}
+        for collection, filename in self._file_map.items():
+            if filename not in loaded_files:
+                loaded_files[filename] = self._load_file(filename)
+            self._data_cache[filename] = loaded_files[filename]
+
+    def _cache_file_mtimes(self):
+        """Cache modification times of all data files"""
+        for filename in set(self._file_map.values()):
+            file_path = self._snapshot_path(filename)
+            if file_path.exists():
+                self._file_mtimes[filename] = os.path.getmtime(file_path)
+
+    def _collections_in(self, filename: str) -> List[str]:
+        """Collections stored in a data file"""
+        return [collection for collection, collection_file in self._file_map.items() if collection_file == filename]
+
+    def _check_and_reload_file(self, filename: str):
+        """Check if file has been modified and reload if necessary"""
+        if self._sequence is not None:
+            # Multi-process mode: other workers announce their writes in the change sequence.
+            # Reload under the lock so a writer never works on the copy being replaced.
+            collections = self._collections_in(filename)
+            if self._sequence.pending(collections):
+                with self._lock:
+                    file_path = self._snapshot_path(filename)
+                    if self._sequence.changed(collections) and file_path.exists():
+                        self._reload_file(filename, os.path.getmtime(file_path))
+            return
+        # Skip the filesystem metadata calls unless the reload policy asks for them
+        if self.reload_policy == "never":
+            return
+        if self.reload_policy == "ttl":
+            now = time.monotonic()
+            if now - self._last_checked.get(filename, float("-inf")) < self.reload_ttl:
+                return
+            self._last_checked[filename] = now
+        elif self.reload_policy == "inotify":
+            if filename not in self._stale_files:
+                return
+            self._stale_files.discard(filename)
+
+        file_path = self._snapshot_path(filename)
+        if not file_path.exists():
+            return
+
+        current_mtime = os.path.getmtime(file_path)
+        cached_mtime = self._file_mtimes.get(filename)
+
+        # 如果文件有改动，重新加载（尚未写回磁盘的改动优先）
+        if filename in self._dirty:
+            return
+        if cached_mtime is None or current_mtime > cached_mtime:
+            self._reload_file(filename, current_mtime)
+
+    def _reload_file(self, filename: str, mtime: float):
+        """Replace the cached data of a file with its contents on disk"""
+        self._data_cache[filename] = self._load_file(filename)
+        self._file_mtimes[filename] = mtime
+        self._invalidate_indexes(filename)
+        metrics.STORAGE_RELOADS.inc(file=filename)
+        if self.reload_listener is not None:
+            for collection in self._collections_in(filename):
+                self.reload_listener(collection)
+
+    def _invalidate_indexes(self, filename: str):
+        """Drop the indexes of every collection stored in a file"""
+        for collection, collection_file in self._file_map.items():
+            if collection_file == filename:
+                self._id_index.pop(collection, None)
+                self._max_ids.pop(collection, None)
+                self._field_indexes.pop(collection, None)
+                self._sorted_keys.pop(collection, None)
+                if collection == "authCredentials":
+                    self._username_index = None
+
+    def _build_id_index(self, collection: str, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Build the id -> position index for a collection"""
+        index: Dict[str, int] = {}
+        max_id = 0
+        for position, item in enumerate(items):
+            item_id = item.get("id")
+            # Keep the first occurrence, matching the order of a linear scan
+            index.setdefault(normalize_id(item_id), position)
+            if isinstance(item_id, int):
+                max_id = max(max_id, item_id)
+        self._id_index[collection] = index
+        self._max_ids[collection] = max_id
+        # Rebuilt lazily from the new index
+        self._sorted_keys.pop(collection, None)
+        return index
+
+    def _get_sorted_keys(self, collection: str, items: List[Dict[str, Any]]) -> List[Tuple[int, Any]]:
+        """Get the sorted ID keys of a collection, building them if needed"""
+        keys = self._sorted_keys.get(collection)
+        if keys is None:
+            index = self._get_id_index(collection, items)
+            keys = sorted(id_sort_key(items[position].get("id")) for position in index.values())
+            self._sorted_keys[collection] = keys
+        return keys
+
+    def _get_id_index(self, collection: str, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Get the id -> position index for a collection, building it if needed"""
+        index = self._id_index.get(collection)
+        if index is None:
+            index = self._build_id_index(collection, items)
+        return index
+
+    def _find_position(self, collection: str, item_id: Any) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get a collection and the position of an item in it, using the id index"""
+        items = self.get_all(collection)
+        index = self._get_id_index(collection, items)
+
+        key = normalize_id(item_id)
+        position = index.get(key)
+        if position is not None and (
+            position >= len(items) or normalize_id(items[position].get("id")) != key
+        ):
+            # The list changed without going through this backend; rebuild the index
+            position = self._build_id_index(collection, items).get(key)
+        return items, position
+
+    def _get_field_indexes(self, collection: str) -> Dict[str, Dict[str, Set[str]]]:
+        """Get the secondary indexes for a collection, building them if needed"""
+        indexes = self._field_indexes.get(collection)
+        if indexes is None:
+            items = self.get_all(collection)
+            with self._lock:
+                indexes = self._field_indexes.get(collection)
+                if indexes is None:
+                    # Built aside and published whole: readers on other threads never see a partial index
+                    indexes = {field: {} for field in INDEXED_FIELDS.get(collection, ())}
+                    for item in items:
+                        _add_to_indexes(indexes, item)
+                    self._field_indexes[collection] = indexes
+        return indexes
+
+    def _index_item(self, collection: str, item: Dict[str, Any]):
+        """Add an item to the secondary indexes of its collection"""
+        indexes = self._field_indexes.get(collection)
+        if not indexes:
+            # Not built yet; it will be built from the data on first query
+            return
+        _add_to_indexes(indexes, item)
+
+    def _unindex_item(self, collection: str, item: Dict[str, Any]):
+        """Remove an item from the secondary indexes of its collection"""
+        indexes = self._field_indexes.get(collection)
+        if not indexes:
+            return
+        key = normalize_id(item.get("id"))
+        for field, values in indexes.items():
+            value = normalize_id(item.get(field))
+            ids = values.get(value)
+            if ids is not None:
+                ids.discard(key)
+                if not ids:
+                    del values[value]
+
+    def _get_collection_data(self, collection: str) -> List[Dict[str, Any]]:
+        """Get the data array for a collection from the appropriate file"""
+        filename = self._file_map.get(collection)
+        if not filename:
+            return []
+
+        # 检查文件是否有改动，如果有则自动重新加载
+        self._check_and_reload_file(filename)
+
+        file_data = self._data_cache.get(filename, {})
+
+        # Handle special cases
+        if collection == "authCredentials":
+            return file_data.get("authCredentials", [])
+        elif collection == "calendarEvents":
+            return file_data.get("calendarEvents", [])
+        elif collection == "teams":
+            return file_data.get("teams", [])
+        elif collection == "contexts":
+            return file_data.get("contexts", [])
+        elif collection == "scheduledCategories":
+            return file_data.get("scheduledCategories", [])
+        elif collection == "reports":
+            return file_data.get("reports", [])
+        else:
+            # Standard collections: users, tasks, projects, shopItems, achievements
+            return file_data.get(collection, [])
+
+    def _save_collection_data(self, collection: str, data: List[Dict[str, Any]]):
+        """Save collection data back to its file"""
+        filename = self._file_map.get(collection)
+        if not filename:
+            raise ValueError(f"Unknown collection: {collection}")
+
+        file_data = self._data_cache.get(filename, {})
+
+        # Handle special cases
+        if collection == "authCredentials":
+            file_data["authCredentials"] = data
+        elif collection == "calendarEvents":
+            file_data["calendarEvents"] = data
+        elif collection == "teams":
+            file_data["teams"] = data
+        elif collection == "contexts":
+            file_data["contexts"] = data
+        elif collection == "scheduledCategories":
+            file_data["scheduledCategories"] = data
+        elif collection == "reports":
+            file_data["reports"] = data
+        else:
+            # Standard collections
+            file_data[collection] = data
+
+        self._data_cache[filename] = file_data
+        if collection == "authCredentials":
+            self._username_index = None
+        if self._batch_depth:
+            self._batch_files.add(filename)
+        else:
+            self._persist_file(filename)
+
+    def _persist_file(self, filename: str):
+        """Persist a changed file according to the journal / write-behind settings"""
+        file_data = self._data_cache.get(filename, {})
+        if self.journal:
+            # The change is already durable in the journal; fold the journal
+            # into the snapshot once it grows too large
+            if self._journal_sizes.get(filename, 0) >= self.journal_max_bytes:
+                self._dirty[filename] = self._dirty.get(filename, 0) + 1
+                if self.write_behind:
+                    self._flush_event.set()
+                else:
+                    self.flush()
+        elif self.write_behind:
+            self._mark_dirty(filename)
+        else:
+            self._save_file(filename, file_data)
+            if self._sequence is not None:
+                self._sequence.bump(self._collections_in(filename))
+
+    def refresh(self, collection: str):
+        """Reload a collection's file if it changed on disk, following the reload policy"""
+        filename = self._file_map.get(collection)
+        if filename:
+            self._check_and_reload_file(filename)
+
+    @contextmanager
+    def exclusive(self):
+        """Keep other processes from writing during the block, starting from their latest changes
+
+        Only does anything in multi-process mode.
+        """
+        if self._process_lock is None:
+            yield
+            return
+        with self._process_lock:
+            for filename in set(self._file_map.values()):
+                self._check_and_reload_file(filename)
+            yield
+
+    @contextmanager
+    def batch(self):
+        """Apply the mutations in the block under one lock and persist each changed file once"""
+        with self.exclusive(), self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    # Persist even on failure so the disk matches what was applied in memory
+                    pending, self._batch_files = self._batch_files, set()
+                    for filename in sorted(pending):
+                        self._persist_file(filename)
+
+    def _mark_dirty(self, filename: str):
+        """Record a pending write; wake the flusher once enough changes pile up"""
+        with self._lock:
+            self._dirty[filename] = self._dirty.get(filename, 0) + 1
+            if sum(self._dirty.values()) >= self.flush_max_dirty:
+                self._flush_event.set()
+
+    def _flush_loop(self):
+        """Background thread: flush dirty files every interval or when woken early"""
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every dirty file to disk, one write per file"""
+        with self._lock:
+            pending = {}
+            for filename in self._dirty:
+                pending[filename] = self._serialize(filename, self._data_cache.get(filename, {}))
+                # Journal records logged from here on belong to the next snapshot
+                self._rotate_journal(filename)
+            self._dirty.clear()
+            # Take the write lock before releasing the cache so snapshots reach the disk in order
+            self._flush_lock.acquire()
+
+        failed = []
+        try:
+            for filename, payload in pending.items():
+                try:
+                    self._write_file(filename, payload)
+                except OSError:
+                    logger.exception("Failed to flush %s, will retry", filename)
+                    failed.append(filename)
+                    continue
+                # The snapshot now holds everything the rotated journal did
+                self._journal_path(filename, rotated=True).unlink(missing_ok=True)
+        finally:
+            self._flush_lock.release()
+
+        if failed:
+            with self._lock:
+                for filename in failed:
+                    self._dirty[filename] = self._dirty.get(filename, 0) + 1
+
+    def compact(self):
+        """Fold every journal into its snapshot file"""
+        with self._lock:
+            for filename in self._journal_sizes:
+                if self._journal_sizes[filename] or self._journal_path(filename, rotated=True).exists():
+                    self._dirty[filename] = self._dirty.get(filename, 0) + 1
+        self.flush()
+
+    def close(self):
+        """Stop the background threads and write out pending changes"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._flusher is not None:
+            self._stop_event.set()
+            self._flush_event.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        # Any later writes go straight to disk
+        self.write_behind = False
+        with self._lock:
+            for journal_file in self._journal_files.values():
+                journal_file.close()
+            self._journal_files.clear()
+        if self._process_lock is not None:
+            self._sequence.close()
+            self._process_lock.close()
+            self._sequence = self._process_lock = None
+
+    def get_all(self, collection: str) -> List[Dict[str, Any]]:
+        """Get all items from a collection"""
+        return self._get_collection_data(collection)
+
+    def get_by_id(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        """Get an item by ID from a collection"""
+        # Handle both int and string IDs through the normalized index
+        items, position = self._find_position(collection, item_id)
+        if position is None:
+            return None
+        return items[position]
+
+    def create(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new item in a collection"""
+        with self.exclusive(), self._lock:
+            items = self.get_all(collection)
+            index = self._id_index.get(collection)
+            if index is None:
+                index = self._build_id_index(collection, items)
+
+            # Auto-generate ID if not provided
+            if "id" not in item:
+                item["id"] = self._max_ids[collection] + 1
+            if self.journal:
+                self._append_journal(collection, "create", item["id"], item)
+
+            items.append(item)
+            key = normalize_id(item["id"])
+            if key not in index:
+                index[key] = len(items) - 1
+                sorted_keys = self._sorted_keys.get(collection)
+                if sorted_keys is not None:
+                    bisect.insort(sorted_keys, id_sort_key(item["id"]))
+            if isinstance(item["id"], int):
+                self._max_ids[collection] = max(self._max_ids[collection], item["id"])
+            self._index_item(collection, item)
+            self._save_collection_data(collection, items)
+            return item
+
+    def update(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an item in a collection"""
+        with self.exclusive(), self._lock:
+            items, position = self._find_position(collection, item_id)
+            if position is None:
+                return None
+            if self.journal:
+                self._append_journal(collection, "update", item_id, updates)
+
+            updated_item = {**items[position], **updates}
+            self._unindex_item(collection, items[position])
+            items[position] = updated_item
+            if normalize_id(updated_item.get("id")) != normalize_id(item_id):
+                # The ID itself changed
+                self._build_id_index(collection, items)
+            self._index_item(collection, updated_item)
+            self._save_collection_data(collection, items)
+            return updated_item
+
+    def delete(self, collection: str, item_id: Any) -> bool:
+        """Delete an item from a collection"""
+        with self.exclusive(), self._lock:
+            items, position = self._find_position(collection, item_id)
+            if position is None:
+                return False
+            if self.journal:
+                self._append_journal(collection, "delete", item_id)
+
+            removed = items.pop(position)
+            self._unindex_item(collection, removed)
+            index = self._id_index[collection]
+            index.pop(normalize_id(removed.get("id")), None)
+            # Shift the positions of the items after the removed one
+            for i in range(position, len(items)):
+                key = normalize_id(items[i].get("id"))
+                current = index.get(key)
+                if current is None or current > i:
+                    index[key] = i
+            sorted_keys = self._sorted_keys.get(collection)
+            if sorted_keys is not None and normalize_id(removed.get("id")) not in index:
+                removed_key = id_sort_key(removed.get("id"))
+                at = bisect.bisect_left(sorted_keys, removed_key)
+                if at < len(sorted_keys) and sorted_keys[at] == removed_key:
+                    del sorted_keys[at]
+            self._save_collection_data(collection, items)
+            return True
+
+    def get_auth_credentials(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get authentication credentials for a username through the username index"""
+        credentials = self.get_all("authCredentials")
+        index = self._username_index
+        if index is None:
+            index = {}
+            for position, cred in enumerate(credentials):
+                index.setdefault(cred.get("username"), position)
+            self._username_index = index
+        position = index.get(username)
+        if position is None:
+            return None
+        if position < len(credentials) and credentials[position].get("username") == username:
+            return credentials[position]
+        # Index out of date (credentials edited in place); fall back to a scan
+        self._username_index = None
+        return super().get_auth_credentials(username)
+
+    def query(self, collection: str, **filters: Any) -> List[Dict[str, Any]]:
+        """Get the items whose fields equal the given values, using secondary indexes where possible"""
+        expected = {field: normalize_id(value) for field, value in filters.items() if value is not None}
+        indexes = self._get_field_indexes(collection)
+        indexed = [field for field in expected if field in indexes]
+        if not indexed:
+            return super().query(collection, **filters)
+
+        items = self.get_all(collection)
+        id_index = self._get_id_index(collection, items)
+        # Intersect the candidate id sets, smallest first
+        candidate_sets = sorted((indexes[field].get(expected[field], set()) for field in indexed), key=len)
+        candidates = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+        metrics.STORAGE_SCAN_LENGTH.observe(len(candidates), collection=collection, lookup="query")
+        positions = sorted(id_index[key] for key in candidates if key in id_index)
+        # Re-check every candidate: items may have been modified in place since they were indexed
+        return [
+            items[position]
+            for position in positions
+            if position < len(items) and matches_filters(items[position], expected)
+        ]
+
+    def page(
+        self,
+        collection: str,
+        limit: int,
+        after: Any = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Get up to limit items ordered by ID, starting after the given ID"""
+        expected = {field: normalize_id(value) for field, value in filters.items() if value is not None}
+        items = self.get_all(collection)
+        keys = self._get_sorted_keys(collection, items)
+        id_index = self._get_id_index(collection, items)
+        start = bisect.bisect_right(keys, id_sort_key(after)) if after is not None else 0
+        if not expected:
+            return self._items_at(items, id_index, (value for _, value in keys[start:start + limit]))
+
+        indexes = self._get_field_indexes(collection)
+        candidate_sets = [indexes[field].get(value, set()) for field, value in expected.items() if field in indexes]
+        candidates = min(candidate_sets, key=len, default=None)
+        if candidates is not None and len(candidates) < len(keys) - start:
+            # Fewer indexed matches than IDs past the cursor: take the lowest of them
+            after_key = id_sort_key(after) if after is not None else None
+            matching = (
+                (id_sort_key(item.get("id")), item)
+                for item in self._items_at(items, id_index, candidates)
+                if matches_filters(item, expected)
+            )
+            if after_key is not None:
+                matching = (pair for pair in matching if pair[0] > after_key)
+            metrics.STORAGE_SCAN_LENGTH.observe(len(candidates), collection=collection, lookup="page")
+            return [item for _, item in heapq.nsmallest(limit, matching, key=lambda pair: pair[0])]
+
+        # Walk the IDs from the cursor until limit items match
+        result = []
+        scanned = 0
+        for _, value in keys[start:]:
+            if len(result) >= limit:
+                break
+            scanned += 1
+            position = id_index.get(normalize_id(value))
+            if position is not None and position < len(items) and matches_filters(items[position], expected):
+                result.append(items[position])
+        metrics.STORAGE_SCAN_LENGTH.observe(scanned, collection=collection, lookup="page")
+        return result
+
+    @staticmethod
+    def _items_at(items: List[Dict[str, Any]], id_index: Dict[str, int], ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        """The items with the given IDs, skipping IDs the index no longer resolves"""
+        result = []
+        for item_id in ids:
+            position = id_index.get(normalize_id(item_id))
+            if position is not None and position < len(items):
+                result.append(items[position])
+        return result
@@ -0,0 +1,112 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.services.storage.base import COLLECTION_FILES
+
+# One unsigned 64-bit counter per collection
+_SLOT = struct.Struct("<Q")
+
+
+class FileLock:
+    """Exclusive lock shared by every process that opens the same lock file (fcntl.flock)
+
+    Reentrant within a process: the thread holding it may acquire it again,
+    other threads of the process wait like other processes do.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class ChangeSequence:
+    """Per-collection change counters in a small memory-mapped file shared by processes
+
+    A writer bumps the counters of the collections it changed once the change
+    is visible to other processes; readers compare the counters with the
+    values they last saw to find out what to reload, without touching the disk.
+    """
+
+    def __init__(self, path: Path, lock: FileLock):
+        self.path = Path(path)
+        self._lock = lock
+        # Fixed layout over every known collection, so all processes agree on the slots
+        self._slots = {name: i * _SLOT.size for i, name in enumerate(sorted(COLLECTION_FILES))}
+        size = _SLOT.size * len(self._slots)
+        with lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                self._map = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+        # Counter values this process has caught up with
+        self._seen: Dict[str, int] = {name: self.read(name) for name in self._slots}
+
+    def read(self, collection: str) -> int:
+        """Current counter of a collection"""
+        return _SLOT.unpack_from(self._map, self._slots[collection])[0]
+
+    def bump(self, collections: Iterable[str]):
+        """Record a change to the collections; this process counts as caught up with it"""
+        with self._lock:
+            for collection in collections:
+                value = self.read(collection) + 1
+                _SLOT.pack_into(self._map, self._slots[collection], value)
+                self._seen[collection] = value
+
+    def pending(self, collections: Iterable[str]) -> bool:
+        """Whether any of the collections changed since this process last caught up"""
+        return any(self.read(collection) != self._seen[collection] for collection in collections)
+
+    def changed(self, collections: Iterable[str]) -> List[str]:
+        """Collections changed by other processes since the last call; marks them as seen"""
+        changed = []
+        for collection in collections:
+            value = self.read(collection)
+            if value != self._seen[collection]:
+                self._seen[collection] = value
+                changed.append(collection)
+        return changed
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,82 @@
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.services.storage.base import StorageBackend
+
+
+class RoutedStorage(StorageBackend):
+    """Serves some collections from a local backend and the rest from a shared one
+
+    Used for shards: each shard's partitioned collections live in its own
+    files or database, everything else in the shared store. flush() and
+    close() only touch the local backend; the shared one belongs to its owner.
+    """
+
+    def __init__(self, shared: StorageBackend, local: StorageBackend, local_collections: Iterable[str]):
+        self.shared = shared
+        self.local = local
+        self.local_collections = frozenset(local_collections)
+
+    def _backend(self, collection: str) -> StorageBackend:
+        return self.local if collection in self.local_collections else self.shared
+
+    @property
+    def reload_listener(self) -> Optional[Callable[[str], None]]:
+        return self.local.reload_listener
+
+    @reload_listener.setter
+    def reload_listener(self, listener: Optional[Callable[[str], None]]):
+        # The shared backend reports reloads to its own owner
+        self.local.reload_listener = listener
+
+    def get_all(self, collection: str) -> List[Dict[str, Any]]:
+        return self._backend(collection).get_all(collection)
+
+    def get_by_id(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        return self._backend(collection).get_by_id(collection, item_id)
+
+    def create(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        return self._backend(collection).create(collection, item)
+
+    def update(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._backend(collection).update(collection, item_id, updates)
+
+    def delete(self, collection: str, item_id: Any) -> bool:
+        return self._backend(collection).delete(collection, item_id)
+
+    def filter(self, collection: str, predicate: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+        return self._backend(collection).filter(collection, predicate)
+
+    def query(self, collection: str, **filters: Any) -> List[Dict[str, Any]]:
+        return self._backend(collection).query(collection, **filters)
+
+    def page(self, collection: str, limit: int, after: Any = None, **filters: Any) -> List[Dict[str, Any]]:
+        return self._backend(collection).page(collection, limit, after, **filters)
+
+    def get_auth_credentials(self, username: str) -> Optional[Dict[str, Any]]:
+        return self.shared.get_auth_credentials(username)
+
+    def refresh(self, collection: str):
+        self._backend(collection).refresh(collection)
+
+    @contextmanager
+    def exclusive(self):
+        """Lock both backends, local before shared like batch()"""
+        with ExitStack() as stack:
+            stack.enter_context(self.local.exclusive())
+            stack.enter_context(self.shared.exclusive())
+            yield
+
+    @contextmanager
+    def batch(self):
+        """Batch both backends, always local before shared so every shard takes the locks in the same order"""
+        with ExitStack() as stack:
+            stack.enter_context(self.local.batch())
+            stack.enter_context(self.shared.batch())
+            yield
+
+    def flush(self):
+        self.local.flush()
+
+    def close(self):
+        self.local.close()
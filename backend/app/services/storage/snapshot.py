@@ -0,0 +1,214 @@
+"""Snapshot formats of the JSON engine's data files.
+
+    json     pretty-printed JSON, mock_*.json (default)
+    compact  JSON without indentation, mock_*.compact.json; read and written with orjson when installed
+    msgpack  indexed MessagePack, mock_*.msgpack (needs the msgpack package). Each
+             collection is encoded on its own, so with lazy loading the file is
+             memory-mapped and a collection is only decoded when first used.
+
+A data file that has no snapshot in the configured format yet is read from its
+JSON file, and saved in the configured format on the next write. To convert a
+data directory up front (from the backend directory):
+    python -m app.services.storage.convert --to msgpack [--data-dir data]
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.services.storage.base import COLLECTION_FILES
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see pyproject extras
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency, see pyproject extras
+    msgpack = None
+
+SNAPSHOT_FORMATS = ("json", "compact", "msgpack")
+
+# msgpack snapshot layout: MAGIC, header length (uint32 LE), header (msgpack map of
+# collection -> [offset, length] relative to the end of the header), collection blobs
+MAGIC = b"CTSNAP1\n"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def check_format(fmt: str, lazy: bool = False):
+    """Raise ValueError for an unknown format, or one whose package is missing"""
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format: {fmt}")
+    if fmt == "msgpack" and msgpack is None:
+        raise ValueError("The msgpack snapshot format needs the msgpack package (pip install .[snapshot])")
+    if lazy and fmt != "msgpack":
+        raise ValueError("Lazy snapshot loading needs the msgpack snapshot format")
+
+
+def snapshot_name(filename: str, fmt: str) -> str:
+    """Name of a data file's snapshot in a format, e.g. mock_tasks.json -> mock_tasks.msgpack"""
+    if fmt == "compact":
+        return f"{Path(filename).stem}.compact.json"
+    if fmt == "msgpack":
+        return f"{Path(filename).stem}.msgpack"
+    return filename
+
+
+def _read_index(buffer) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """Parse a msgpack snapshot header: collection -> (absolute offset, length)"""
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a msgpack snapshot")
+    start = len(MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+    header = msgpack.unpackb(buffer[start:start + header_length])
+    base = start + header_length
+    return {name: (base + offset, length) for name, (offset, length) in header.items()}, base
+
+
+class LazySnapshot(MutableMapping):
+    """Collections of a memory-mapped msgpack snapshot, each decoded on first access"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Collections not decoded yet -> (offset, length) in the map
+        self._encoded, _ = _read_index(self._map)
+        self._decoded: Dict[str, Any] = {}
+        # Readers may race to decode the same collection; only one copy may win
+        self._lock = threading.Lock()
+
+    def raw(self, name: str) -> Optional[bytes]:
+        """Encoded bytes of a collection that was never decoded (so is unchanged), else None"""
+        with self._lock:
+            span = self._encoded.get(name)
+            if span is None:
+                return None
+            offset, length = span
+            return self._map[offset:offset + length]
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._decoded.get(name, self)
+        if value is not self:
+            return value
+        with self._lock:
+            if name not in self._decoded:
+                if name not in self._encoded:
+                    raise KeyError(name)
+                offset, length = self._encoded.pop(name)
+                self._decoded[name] = msgpack.unpackb(self._map[offset:offset + length])
+            return self._decoded[name]
+
+    def __setitem__(self, name: str, value: Any):
+        with self._lock:
+            self._encoded.pop(name, None)
+            self._decoded[name] = value
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            found = self._encoded.pop(name, None) is not None
+            found = self._decoded.pop(name, None) is not None or found
+        if not found:
+            raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter([*self._decoded, *self._encoded])
+
+    def __len__(self) -> int:
+        return len(self._decoded) + len(self._encoded)
+
+
+def encode(data: MutableMapping, fmt: str) -> bytes:
+    """Encode the collections of a data file in a snapshot format"""
+    if fmt == "json":
+        return json.dumps(dict(data), indent=2, ensure_ascii=False).encode("utf-8")
+    if fmt == "compact":
+        if orjson is not None:
+            return orjson.dumps(dict(data), option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(dict(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if fmt == "msgpack":
+        header = {}
+        blobs = []
+        offset = 0
+        for name in data:
+            # Collections never decoded from a lazy snapshot are copied as they are
+            blob = data.raw(name) if isinstance(data, LazySnapshot) else None
+            if blob is None:
+                blob = msgpack.packb(data[name], use_bin_type=True)
+            header[name] = [offset, len(blob)]
+            offset += len(blob)
+            blobs.append(blob)
+        head = msgpack.packb(header, use_bin_type=True)
+        return b"".join([MAGIC, _HEADER_LENGTH.pack(len(head)), head, *blobs])
+    raise ValueError(f"Unknown snapshot format: {fmt}")
+
+
+def load(path: Path, fmt: str, lazy: bool = False) -> MutableMapping:
+    """Load a snapshot file (lazily, for msgpack with lazy=True)"""
+    if fmt == "msgpack":
+        if lazy and os.path.getsize(path):
+            return LazySnapshot(path)
+        raw = Path(path).read_bytes()
+        if not raw:
+            return {}
+        index, _ = _read_index(raw)
+        return {name: msgpack.unpackb(raw[offset:offset + length]) for name, (offset, length) in index.items()}
+    raw = Path(path).read_bytes()
+    if fmt == "compact" and orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def read(data_dir: Path, filename: str, fmt: str, lazy: bool = False) -> MutableMapping:
+    """Load a data file's collections from its snapshot in fmt, else from its JSON file; {} if neither exists"""
+    path = Path(data_dir) / snapshot_name(filename, fmt)
+    if path.exists():
+        return load(path, fmt, lazy)
+    json_path = Path(data_dir) / filename
+    if json_path.exists():
+        return load(json_path, "json")
+    return {}
+
+
+def write(path: Path, payload: bytes):
+    """Atomically replace a file with payload"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def convert(data_dir: Path, source: str, target: str) -> Dict[str, Tuple[int, int]]:
+    """Rewrite every data file in data_dir from the source format into the target format
+
+    Source files are kept. Returns the source and target size in bytes per data file.
+    """
+    check_format(source)
+    check_format(target)
+    if source == target:
+        raise ValueError("Source and target format are the same")
+    data_dir = Path(data_dir)
+    sizes = {}
+    for filename in sorted(set(COLLECTION_FILES.values())):
+        source_path = data_dir / snapshot_name(filename, source)
+        if not source_path.exists():
+            continue
+        payload = encode(load(source_path, source), target)
+        write(data_dir / snapshot_name(filename, target), payload)
+        sizes[filename] = (source_path.stat().st_size, len(payload))
+    return sizes
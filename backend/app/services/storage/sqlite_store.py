@@ -0,0 +1,302 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.storage.base import (
+    COLLECTION_FILES,
+    INDEXED_FIELDS,
+    StorageBackend,
+    id_sort_key,
+    normalize_id,
+)
+from app.services.storage.multiprocess import ChangeSequence, FileLock
+
+# Orders rows like id_sort_key: integer IDs first, numerically, then the rest as text
+_ID_RANK = "(CASE json_type(data, '$.id') WHEN 'integer' THEN 0 ELSE 1 END)"
+_ID_VALUE = "(CASE json_type(data, '$.id') WHEN 'integer' THEN json_extract(data, '$.id') ELSE id END)"
+
+
+class SqliteStorage(StorageBackend):
+    """Storage engine with one SQLite table per collection, keyed by an indexed ID column.
+
+    Each row keeps the item as a JSON document, so a write touches a single row
+    instead of re-serializing the whole collection.
+    """
+
+    def __init__(self, db_path: Path, multiprocess: bool = False):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: every statement outside an explicit BEGIN is its own transaction
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        # Highest integer ID per collection, computed lazily for auto-generated IDs
+        self._max_ids: Dict[str, int] = {}
+        # Nesting depth of batch() blocks on the connection
+        self._batch_depth = 0
+        # Multi-process mode: SQLite serializes the writers itself, the change sequence
+        # tells the other worker processes which collections changed (for versions/ETags)
+        self._sequence: Optional[ChangeSequence] = None
+        self._process_lock: Optional[FileLock] = None
+        # Collections written in the current batch, announced once it commits
+        self._changed: Set[str] = set()
+        if multiprocess:
+            self._process_lock = FileLock(self.db_path.with_name(self.db_path.name + ".lock"))
+            self._sequence = ChangeSequence(self.db_path.with_name(self.db_path.name + ".seq"), self._process_lock)
+
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    @staticmethod
+    def _field_expr(field: str) -> str:
+        """SQL expression for a top-level field, normalized to text like normalize_id"""
+        if not field.isidentifier():
+            raise ValueError(f"Invalid field name: {field}")
+        return f"CAST(json_extract(data, '$.{field}') AS TEXT)"
+
+    def _table(self, collection: str) -> str:
+        """Get the table name for a collection"""
+        if collection not in COLLECTION_FILES:
+            raise ValueError(f"Unknown collection: {collection}")
+        return collection
+
+    def _create_tables(self):
+        """Create one table per collection with an indexed primary key"""
+        with self._lock:
+            for collection in COLLECTION_FILES:
+                self._conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{collection}" '
+                    "(seq INTEGER PRIMARY KEY, id TEXT, data TEXT NOT NULL)"
+                )
+                self._conn.execute(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "idx_{collection}_id" ON "{collection}" (id)'
+                )
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{collection}_order" ON "{collection}" ({_ID_RANK}, {_ID_VALUE})'
+                )
+            # Secondary indexes backing query()
+            for collection, fields in INDEXED_FIELDS.items():
+                for field in fields:
+                    self._conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{collection}_{field}" '
+                        f'ON "{collection}" ({self._field_expr(field)})'
+                    )
+            # Credentials are looked up by username rather than by ID
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS "idx_authCredentials_username" '
+                "ON \"authCredentials\" (json_extract(data, '$.username'))"
+            )
+
+    @staticmethod
+    def _dumps(item: Dict[str, Any]) -> str:
+        return json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _row_key(item: Dict[str, Any]) -> Optional[str]:
+        return normalize_id(item["id"]) if item.get("id") is not None else None
+
+    def _next_id(self, table: str) -> int:
+        """Get the next auto-generated integer ID for a table"""
+        # Other processes may have inserted rows since the maximum was cached
+        if table not in self._max_ids or self._sequence is not None:
+            row = self._conn.execute(
+                f"SELECT MAX(json_extract(data, '$.id')) FROM \"{table}\" "
+                "WHERE json_type(data, '$.id') = 'integer'"
+            ).fetchone()
+            self._max_ids[table] = row[0] or 0
+        return self._max_ids[table] + 1
+
+    def _track_id(self, table: str, item_id: Any):
+        if isinstance(item_id, int) and table in self._max_ids:
+            self._max_ids[table] = max(self._max_ids[table], item_id)
+
+    def _announce(self, collection: str):
+        """Tell other processes about a write once it is committed (multi-process mode)"""
+        if self._sequence is None:
+            return
+        if self._batch_depth:
+            self._changed.add(collection)
+        else:
+            self._sequence.bump([collection])
+
+    def refresh(self, collection: str):
+        """Report collections written by other processes to the reload listener (multi-process mode)"""
+        if self._sequence is None:
+            return
+        self._table(collection)
+        if self._sequence.changed([collection]) and self.reload_listener is not None:
+            self.reload_listener(collection)
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the database write lock for the block in multi-process mode, see StorageBackend.exclusive"""
+        if self._sequence is None:
+            yield
+            return
+        with self.batch():
+            yield
+
+    @contextmanager
+    def batch(self):
+        """Run the mutations in the block as a single SQLite transaction"""
+        with self._lock:
+            if self._batch_depth:
+                self._batch_depth += 1
+                try:
+                    yield
+                finally:
+                    self._batch_depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth = 1
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                # Cached ID maxima may include rolled back rows
+                self._max_ids.clear()
+                self._changed.clear()
+                raise
+            else:
+                self._conn.execute("COMMIT")
+                if self._changed:
+                    self._sequence.bump(self._changed)
+                    self._changed.clear()
+            finally:
+                self._batch_depth = 0
+
+    def replace_collection(self, collection: str, items: Iterable[Dict[str, Any]]) -> int:
+        """Replace the whole contents of a collection in a single transaction"""
+        table = self._table(collection)
+        with self.batch():
+            self._conn.execute(f'DELETE FROM "{table}"')
+            count = 0
+            for item in items:
+                self._conn.execute(
+                    f'INSERT INTO "{table}" (id, data) VALUES (?, ?)',
+                    (self._row_key(item), self._dumps(item)),
+                )
+                count += 1
+            self._max_ids.pop(table, None)
+            self._announce(collection)
+        return count
+
+    def get_all(self, collection: str) -> List[Dict[str, Any]]:
+        """Get all items from a collection"""
+        table = self._table(collection)
+        with self._lock:
+            rows = self._conn.execute(f'SELECT data FROM "{table}" ORDER BY seq').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_by_id(self, collection: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        """Get an item by ID from a collection"""
+        table = self._table(collection)
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT data FROM "{table}" WHERE id = ?', (normalize_id(item_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def create(self, collection: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new item in a collection"""
+        table = self._table(collection)
+        with self.exclusive(), self._lock:
+            # Auto-generate ID if not provided
+            if "id" not in item:
+                item["id"] = self._next_id(table)
+            self._conn.execute(
+                f'INSERT INTO "{table}" (id, data) VALUES (?, ?)',
+                (self._row_key(item), self._dumps(item)),
+            )
+            self._track_id(table, item["id"])
+            self._announce(collection)
+        return item
+
+    def update(self, collection: str, item_id: Any, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an item in a collection"""
+        table = self._table(collection)
+        key = normalize_id(item_id)
+        with self.exclusive(), self._lock:
+            row = self._conn.execute(f'SELECT data FROM "{table}" WHERE id = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            updated_item = {**json.loads(row[0]), **updates}
+            self._conn.execute(
+                f'UPDATE "{table}" SET id = ?, data = ? WHERE id = ?',
+                (self._row_key(updated_item), self._dumps(updated_item), key),
+            )
+            self._track_id(table, updated_item.get("id"))
+            self._announce(collection)
+        return updated_item
+
+    def delete(self, collection: str, item_id: Any) -> bool:
+        """Delete an item from a collection"""
+        table = self._table(collection)
+        with self.exclusive(), self._lock:
+            cursor = self._conn.execute(f'DELETE FROM "{table}" WHERE id = ?', (normalize_id(item_id),))
+            if cursor.rowcount > 0:
+                self._announce(collection)
+        return cursor.rowcount > 0
+
+    def _where(self, filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Build WHERE clauses for field filters; None values are ignored"""
+        clauses = []
+        params: List[Any] = []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            clauses.append(f"{self._field_expr(field)} = ?")
+            params.append(normalize_id(value))
+        return clauses, params
+
+    def query(self, collection: str, **filters: Any) -> List[Dict[str, Any]]:
+        """Get the items whose fields equal the given values; None values are ignored"""
+        table = self._table(collection)
+        clauses, params = self._where(filters)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f'SELECT data FROM "{table}"{where} ORDER BY seq', params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def page(
+        self,
+        collection: str,
+        limit: int,
+        after: Any = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Get up to limit items ordered by ID, starting after the given ID"""
+        table = self._table(collection)
+        clauses, params = self._where(filters)
+        if after is not None:
+            clauses.append(f"({_ID_RANK}, {_ID_VALUE}) > (?, ?)")
+            params.extend(id_sort_key(after))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT data FROM "{table}"{where} ORDER BY {_ID_RANK}, {_ID_VALUE} LIMIT ?',
+                [*params, limit],
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_auth_credentials(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get authentication credentials for a username"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM \"authCredentials\" WHERE json_extract(data, '$.username') = ? "
+                "ORDER BY seq LIMIT 1",
+                (username,),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+            if self._sequence is not None:
+                self._sequence.close()
+                self._process_lock.close()
+                self._sequence = self._process_lock = None
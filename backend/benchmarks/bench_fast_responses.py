@@ -0,0 +1,59 @@
+"""Compare GET /api/tasks throughput with and without fast responses.
+
+Runs the app in-process against a synthetic dataset and measures the
+default path (response_model validation) against CORETERRA_FAST_RESPONSES.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_fast_responses [--tasks 10000] [--requests 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datasets import make_tasks, write_dataset
+
+
+def run(tasks: int, requests: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_dataset(Path(tmp), make_tasks(tasks))
+        # Must be set before the app (and its data_service) is imported
+        os.environ["CORETERRA_DATA_DIR"] = str(data_dir)
+        os.environ["CORETERRA_RELOAD_POLICY"] = "never"
+
+        from fastapi.testclient import TestClient
+        from app import config
+        from app.main import app
+        from app.responses import orjson
+
+        with TestClient(app) as client:
+            login = client.post("/api/auth/login", json={"username": "alex", "password": "test"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            print(f"{tasks} tasks, {requests} requests per mode, serializer: {'orjson' if orjson else 'TypeAdapter'}")
+            results = {}
+            for fast in (False, True):
+                config.FAST_RESPONSES = fast
+                # Warm up
+                size = len(client.get("/api/tasks", headers=headers).content)
+                started = time.perf_counter()
+                for _ in range(requests):
+                    client.get("/api/tasks", headers=headers)
+                elapsed = time.perf_counter() - started
+                results[fast] = requests / elapsed
+                label = "fast" if fast else "default"
+                print(f"  {label:8} {results[fast]:8.1f} req/s  {elapsed / requests * 1000:8.2f} ms/req  {size} bytes")
+            print(f"  speedup  {results[True] / results[False]:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000, help="Number of synthetic tasks")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per mode")
+    args = parser.parse_args()
+    run(args.tasks, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare JSON engine startup time across snapshot formats.
+
+Writes a synthetic dataset, converts it to every snapshot format and times
+opening a JsonStorage on it (what _load_all_data costs on startup), plus the
+first read of the large tasks collection and of a small one.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_snapshot [--tasks 100000] [--repeat 5]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.storage import COLLECTION_FILES, JsonStorage, snapshot
+from benchmarks.datasets import make_tasks, write_dataset
+
+# (label, snapshot format, lazy)
+MODES = [
+    ("json", "json", False),
+    ("compact", "compact", False),
+    ("msgpack", "msgpack", False),
+    ("msgpack+lazy", "msgpack", True),
+]
+
+
+def _data_size(data_dir: Path, fmt: str) -> int:
+    return sum((data_dir / snapshot.snapshot_name(name, fmt)).stat().st_size for name in set(COLLECTION_FILES.values()))
+
+
+def _time_mode(data_dir: Path, fmt: str, lazy: bool, repeat: int):
+    """Best-of-repeat seconds to open the storage, then read tasks and a single user"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        storage = JsonStorage(data_dir, snapshot_format=fmt, lazy=lazy, reload_policy="never")
+        opened = time.perf_counter()
+        storage.get_all("tasks")
+        tasks_read = time.perf_counter()
+        storage.get_by_id("users", 1)
+        user_read = time.perf_counter()
+        storage.close()
+        timings = (opened - started, tasks_read - opened, user_read - tasks_read)
+        best = timings if best is None or timings[0] < best[0] else best
+    return best
+
+
+def run(tasks: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        available = [mode for mode in MODES if mode[1] != "msgpack" or snapshot.msgpack is not None]
+        data_dir = write_dataset(Path(tmp), make_tasks(tasks))
+        for fmt in {fmt for _, fmt, _ in available} - {"json"}:
+            snapshot.convert(data_dir, "json", fmt)
+
+        print(f"{tasks} tasks, best of {repeat}, compact encoder: {'orjson' if snapshot.orjson else 'json'}")
+        print(f"  {'mode':14} {'size':>12} {'startup':>10} {'1st tasks':>10} {'1st user':>10} {'speedup':>8}")
+        baseline = None
+        for label, fmt, lazy in available:
+            opened, tasks_read, user_read = _time_mode(data_dir, fmt, lazy, repeat)
+            baseline = baseline or opened
+            print(
+                f"  {label:14} {_data_size(data_dir, fmt):>12} {opened * 1000:>8.1f}ms {tasks_read * 1000:>8.1f}ms"
+                f" {user_read * 1000:>8.2f}ms {baseline / opened:>7.1f}x"
+            )
+        if len(available) < len(MODES):
+            print("  (msgpack modes skipped: pip install .[snapshot])")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100000, help="Number of synthetic tasks")
+    parser.add_argument("--repeat", type=int, default=5, help="Startups per mode (the fastest is reported)")
+    args = parser.parse_args()
+    run(args.tasks, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import json
+import random
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bundled mock data the synthetic datasets are layered on
+SOURCE_DATA_DIR = Path(__file__).parent.parent / "data"
+
+STATUSES = ["inbox", "clarified", "organized", "scheduled", "waiting", "completed", "trash"]
+DIFFICULTIES = ["Easy", "Med", "Hard"]
+ESTIMATED_TIMES = ["15m", "30m", "1h", "2h", "4h"]
+WORDS = [
+    "draft", "review", "fix", "plan", "email", "design", "report", "sync", "deploy", "test",
+    "refactor", "update", "call", "budget", "roadmap", "wireframes", "API", "onboarding",
+]
+
+
+def make_tasks(
+    count: int,
+    seed: int = 0,
+    project_ids: Optional[List[str]] = None,
+    assignee_ids: Optional[List[int]] = None,
+    context_ids: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Generate tasks shaped like the entries of mock_tasks.json"""
+    rng = random.Random(seed)
+    project_ids = project_ids or ["p1", "p2"]
+    assignee_ids = assignee_ids or [1, 2, 3]
+    context_ids = context_ids or ["1", "2", "3", "4", "5", "6"]
+    start = datetime(2023, 1, 1)
+    tasks = []
+    for task_id in range(1, count + 1):
+        created = start + timedelta(minutes=rng.randrange(3 * 365 * 24 * 60))
+        task: Dict[str, Any] = {
+            "id": task_id,
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize(),
+            "status": rng.choice(STATUSES),
+            "createdAt": created.isoformat(),
+            "priority": rng.random() < 0.2,
+            "xpReward": rng.choice([0, 20, 50, 100]),
+        }
+        if rng.random() < 0.7:
+            task["projectId"] = rng.choice(project_ids)
+        if rng.random() < 0.6:
+            task["assigneeId"] = rng.choice(assignee_ids)
+        if rng.random() < 0.5:
+            task["contextId"] = rng.choice(context_ids)
+        if rng.random() < 0.8:
+            task["difficulty"] = rng.choice(DIFFICULTIES)
+            task["estimatedTime"] = rng.choice(ESTIMATED_TIMES)
+        if task["status"] == "completed":
+            task["completedAt"] = (created + timedelta(minutes=rng.randrange(14 * 24 * 60))).isoformat()
+            task["completedBy"] = rng.choice(assignee_ids)
+            if "estimatedTime" in task and rng.random() < 0.5:
+                task["actualTime"] = rng.choice(ESTIMATED_TIMES)
+        if rng.random() < 0.3:
+            task["description"] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 15)))
+        if rng.random() < 0.3:
+            task["dueDate"] = (created + timedelta(days=rng.randint(1, 30))).date().isoformat()
+        if rng.random() < 0.4:
+            task["subtasks"] = [
+                {"id": sub_id, "text": " ".join(rng.choice(WORDS) for _ in range(3)), "done": rng.random() < 0.5}
+                for sub_id in range(1, rng.randint(2, 6))
+            ]
+        tasks.append(task)
+    return tasks
+
+
+def make_projects(count: int) -> List[Dict[str, Any]]:
+    """Generate projects shaped like the entries of mock_projects.json (counters are rebuilt on startup)"""
+    return [
+        {"id": f"p{i}", "title": f"Project {i}", "progress": 0, "totalTasks": 0, "completedTasks": 0}
+        for i in range(1, count + 1)
+    ]
+
+
+def make_users(
+    count: int,
+    seed: int = 0,
+    password_hash: Optional[str] = None,
+    password: str = "test",
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Generate users and their credentials shaped like mock_users.json
+
+    Users are named user1, user2, ... and all share the same password; pass a
+    precomputed bcrypt password_hash to exercise hashed logins. Everyone is
+    rich enough to keep buying shop items.
+    """
+    rng = random.Random(seed)
+    users, credentials = [], []
+    for user_id in range(1, count + 1):
+        level = rng.randint(1, 30)
+        streak = rng.randrange(30)
+        users.append({
+            "id": user_id,
+            "name": f"User {user_id}",
+            "avatar": f"https://i.pravatar.cc/150?u={user_id}",
+            "role": rng.choice(["Designer", "Frontend", "Backend", "QA Lead", "PM"]),
+            "level": level,
+            "currentXP": rng.randrange(500),
+            "maxXP": 500,
+            "gold": 10 ** 9,
+            "streak": streak,
+            "inventory": [],
+            "stats": {
+                **{name: rng.randint(1, 20) for name in ("focus", "execution", "planning", "teamwork", "expertise")},
+                "streak": streak,
+            },
+        })
+        credential: Dict[str, Any] = {"username": f"user{user_id}", "user_id": user_id}
+        if password_hash:
+            credential["password_hash"] = password_hash
+        else:
+            credential["password"] = password
+        credentials.append(credential)
+    return users, credentials
+
+
+def _replace_collections(path: Path, collections: Dict[str, Optional[List[Dict[str, Any]]]]):
+    with open(path, "r", encoding="utf-8") as f:
+        file_data = json.load(f)
+    for name, items in collections.items():
+        if items is not None:
+            file_data[name] = items
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(file_data, f, indent=2, ensure_ascii=False)
+
+
+def write_dataset(
+    dest_dir: Path,
+    tasks: Optional[List[Dict[str, Any]]] = None,
+    users: Optional[List[Dict[str, Any]]] = None,
+    auth_credentials: Optional[List[Dict[str, Any]]] = None,
+    projects: Optional[List[Dict[str, Any]]] = None,
+) -> Path:
+    """Copy the bundled mock data into dest_dir and replace the given collections"""
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    for path in SOURCE_DATA_DIR.glob("mock_*.json"):
+        shutil.copy(path, dest_dir / path.name)
+
+    _replace_collections(dest_dir / "mock_tasks.json", {"tasks": tasks})
+    _replace_collections(dest_dir / "mock_users.json", {"users": users, "authCredentials": auth_credentials})
+    _replace_collections(dest_dir / "mock_projects.json", {"projects": projects})
+    return dest_dir
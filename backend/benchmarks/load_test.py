@@ -0,0 +1,303 @@
+"""Load test the hot endpoints against a synthetic dataset.
+
+Generates users, projects and tasks (with subtasks) at the requested scale,
+drives the real app - in-process through TestClient or over HTTP against a
+local uvicorn - and reports p50/p95/p99 latency and throughput per scenario:
+list tasks, complete task, buy item, login and /users/me.
+
+Results can be saved as a baseline and later runs compared against it; a
+scenario whose p95 grows, or whose throughput drops, by more than the
+tolerance counts as a regression and makes the run exit with status 1.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test [--users 100] [--tasks 10000] [--projects 20]
+        [--requests 200] [--concurrency 1] [--mode inprocess|uvicorn]
+        [--save-baseline baseline.json] [--baseline baseline.json]
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+from benchmarks.datasets import make_projects, make_tasks, make_users, write_dataset
+
+BACKEND_DIR = Path(__file__).parent.parent
+PASSWORD = "test"
+SHOP_ITEM = "item_xp_potion"
+SCENARIOS = ["login", "users_me", "list_tasks", "complete_task", "buy_item"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput (req/s) of one scenario"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "mean_ms": sum(latencies) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "rps": count / elapsed if elapsed else 0.0,
+    }
+
+
+class Workload:
+    """Builds the requests of each scenario against one synthetic dataset"""
+
+    def __init__(self, users: int, tasks: List[Dict[str, Any]], seed: int = 0):
+        self.user_count = users
+        self.rng = random.Random(seed)
+        self.tokens: List[Dict[str, str]] = []
+        self._rng_lock = threading.Lock()
+        # Each complete_task request needs a task that is not completed yet
+        self._open_tasks = iter([task["id"] for task in tasks if task["status"] != "completed"])
+        self._open_lock = threading.Lock()
+        self._next_headers = itertools.count()
+
+    def login_body(self) -> Dict[str, str]:
+        with self._rng_lock:
+            user_id = self.rng.randint(1, self.user_count)
+        return {"username": f"user{user_id}", "password": PASSWORD}
+
+    def headers(self) -> Dict[str, str]:
+        return self.tokens[next(self._next_headers) % len(self.tokens)]
+
+    def open_task(self) -> int:
+        with self._open_lock:
+            try:
+                return next(self._open_tasks)
+            except StopIteration:
+                raise RuntimeError("Ran out of open tasks, generate more with --tasks") from None
+
+    def request(self, scenario: str) -> Callable[[Any], Any]:
+        """A function sending one request of the scenario with the given client"""
+        if scenario == "login":
+            return lambda client: client.post("/api/auth/login", json=self.login_body())
+        if scenario == "users_me":
+            return lambda client: client.get("/api/users/me", headers=self.headers())
+        if scenario == "list_tasks":
+            return lambda client: client.get("/api/tasks", headers=self.headers())
+        if scenario == "complete_task":
+            return lambda client: client.post(f"/api/tasks/{self.open_task()}/complete", headers=self.headers())
+        if scenario == "buy_item":
+            return lambda client: client.post(f"/api/gamification/shop/{SHOP_ITEM}/buy", headers=self.headers())
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def run_scenario(
+    client_factory: Callable[[], Any],
+    send: Callable[[Any], Any],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Send requests (split over concurrency workers) and summarize the latencies"""
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(count: int):
+        nonlocal errors
+        client = client_factory()
+        local, failed = [], 0
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                response = send(client)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            local.append(time.perf_counter() - started)
+            failed += not ok
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, per_worker))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+@contextmanager
+def inprocess_clients(data_dir: Path) -> Iterator[Callable[[], Any]]:
+    """Run the app in this process; every worker shares one TestClient"""
+    # Must be set before the app (and its data_service) is imported
+    os.environ["CORETERRA_DATA_DIR"] = str(data_dir)
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield lambda: client
+
+
+@contextmanager
+def uvicorn_clients(data_dir: Path, port: int) -> Iterator[Callable[[], Any]]:
+    """Run the app under a local uvicorn; every worker gets its own HTTP client"""
+    import httpx
+
+    env = {**os.environ, "CORETERRA_DATA_DIR": str(data_dir)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    clients: List[Any] = []
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become healthy within 30s")
+            time.sleep(0.1)
+
+        def factory():
+            client = httpx.Client(base_url=base_url, timeout=30)
+            clients.append(client)
+            return client
+
+        yield factory
+    finally:
+        for client in clients:
+            client.close()
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run(args) -> Dict[str, Any]:
+    users, credentials = make_users(args.users, seed=args.seed, password=PASSWORD)
+    projects = make_projects(args.projects)
+    tasks = make_tasks(
+        args.tasks,
+        seed=args.seed,
+        project_ids=[project["id"] for project in projects],
+        assignee_ids=[user["id"] for user in users],
+    )
+    workload = Workload(args.users, tasks, seed=args.seed)
+    scenarios = args.scenarios or SCENARIOS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_dataset(Path(tmp), tasks, users=users, auth_credentials=credentials, projects=projects)
+        clients = inprocess_clients(data_dir) if args.mode == "inprocess" else uvicorn_clients(data_dir, args.port)
+        with clients as client_factory:
+            client = client_factory()
+            # One token per concurrent worker, each for a different user
+            for user_id in range(1, min(args.users, args.concurrency) + 1):
+                login = client.post("/api/auth/login", json={"username": f"user{user_id}", "password": PASSWORD})
+                login.raise_for_status()
+                workload.tokens.append({"Authorization": f"Bearer {login.json()['access_token']}"})
+
+            results = {}
+            for scenario in scenarios:
+                send = workload.request(scenario)
+                for _ in range(args.warmup):
+                    send(client)
+                results[scenario] = run_scenario(client_factory, send, args.requests, args.concurrency)
+
+    return {
+        "config": {
+            "mode": args.mode,
+            "users": args.users,
+            "tasks": args.tasks,
+            "projects": args.projects,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": results,
+    }
+
+
+def print_results(report: Dict[str, Any]):
+    config = report["config"]
+    print(
+        f"{config['mode']}: {config['users']} users, {config['tasks']} tasks, {config['projects']} projects, "
+        f"{config['requests']} requests per scenario, concurrency {config['concurrency']}"
+    )
+    print(f"  {'scenario':14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'req/s':>9} {'errors':>7}")
+    for name, result in report["scenarios"].items():
+        print(
+            f"  {name:14} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+            f"{result['mean_ms']:9.2f} {result['rps']:9.1f} {result['errors']:7d}"
+        )
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print the change against a baseline; returns the regressions found"""
+    if baseline.get("config") != report["config"]:
+        print(f"  note: baseline was recorded with a different setup: {baseline.get('config')}")
+    regressions = []
+    print(f"  {'vs baseline':14} {'p95':>9} {'req/s':>9}")
+    for name, result in report["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        p95_change = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = result["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        flags = []
+        if p95_change > tolerance:
+            flags.append("p95")
+        if rps_change < -tolerance:
+            flags.append("throughput")
+        print(f"  {name:14} {p95_change:+9.1%} {rps_change:+9.1%}  {'REGRESSION: ' + ', '.join(flags) if flags else ''}")
+        regressions.extend(f"{name} {flag}" for flag in flags)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="Number of synthetic users")
+    parser.add_argument("--tasks", type=int, default=10000, help="Number of synthetic tasks")
+    parser.add_argument("--projects", type=int, default=20, help="Number of synthetic projects")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests before each scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent clients")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--port", type=int, default=8799, help="Port of the uvicorn server in uvicorn mode")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, help="Scenarios to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, help="Compare against results saved with --save-baseline")
+    parser.add_argument("--save-baseline", type=Path, help="Save the results as JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_results(report)
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+        print(f"  saved baseline to {args.save_baseline}")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"  {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,18 @@
 #!/bin/bash
 # Start the FastAPI backend server
+#
+# Development (default): a single process with auto-reload.
+# Production: WORKERS=4 ./start.sh runs 4 uvicorn worker processes over the same
+# data in multi-process mode (shared write lock + change sequence, see README).
+
+WORKERS=${WORKERS:-1}
 
 echo "Starting Coreterra Backend..."
+if [ "$WORKERS" -gt 1 ]; then
+    # Multi-process mode needs every write on disk before the lock is released
+    export CORETERRA_MULTIPROCESS=1
+    export CORETERRA_WRITE_BEHIND=0
+    export CORETERRA_JOURNAL=0
+    exec uvicorn app.main:app --workers "$WORKERS" --port 8000
+fi
 uvicorn app.main:app --reload --port 8000
-
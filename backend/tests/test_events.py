@@ -0,0 +1,52 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.routers.tasks import _complete_task
+from app.services.data_service import DataService
+from app.services.events import EventHub
+from app.services.storage import JsonStorage
+
+
+class EventIsolationTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        data_dir = Path(tmp.name)
+        self.service = DataService(data_dir=str(data_dir), backend=JsonStorage(data_dir))
+        self.addCleanup(self.service.close)
+        self.hub = EventHub()
+        self.service.add_write_hook(self.hub.publish)
+        self.user_a = self.service.create("users", {"name": "A", "level": 1, "currentXP": 0, "maxXP": 500, "gold": 0})
+        self.user_b = self.service.create("users", {"name": "B", "level": 1, "currentXP": 0, "maxXP": 500, "gold": 0})
+        self.task = self.service.create("tasks", {"title": "B's task", "status": "todo", "difficulty": "Easy"})
+
+    async def _drain(self, subscription):
+        events = []
+        while (event := await subscription.get(timeout=0.05)) is not None:
+            events.append(json.loads(event["data"]))
+        return events
+
+    async def _complete_as_b(self):
+        collections = ("users", "reportRollups", "tasks")
+        stream_a = self.hub.subscribe(collections, self.user_a["id"])
+        stream_b = self.hub.subscribe(collections, self.user_b["id"])
+        await self.service.atransaction(
+            ("tasks", "users", "projects", "reportRollups"), _complete_task, self.task["id"], self.user_b["id"]
+        )
+        return await self._drain(stream_a), await self._drain(stream_b)
+
+    def test_completion_does_not_reach_other_users(self):
+        events_a, events_b = asyncio.run(self._complete_as_b())
+
+        self.assertEqual({event["collection"] for event in events_a}, {"tasks"})
+        self.assertIn(("users", self.user_b["id"]), {(event["collection"], event["id"]) for event in events_b})
+        rollups = [event["item"] for event in events_b if event["collection"] == "reportRollups"]
+        self.assertTrue(rollups)
+        self.assertTrue(all(rollup["userId"] == self.user_b["id"] for rollup in rollups))
+
+
+if __name__ == "__main__":
+    unittest.main()
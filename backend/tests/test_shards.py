@@ -0,0 +1,55 @@
+import gc
+import tempfile
+import unittest
+import weakref
+from pathlib import Path
+from unittest import mock
+
+from app.services import shards
+from app.services.data_service import DataService
+from app.services.storage import JsonStorage
+
+
+class ShardEvictionTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root_dir = Path(tmp.name)
+        self.root = DataService(data_dir=str(self.root_dir), backend=JsonStorage(self.root_dir / "root"))
+        self.addCleanup(self.root.close)
+
+    def test_evicted_shard_is_collected_and_closed(self):
+        closed = []
+        open_backend = shards.create_configured_backend
+
+        def tracked_backend(data_dir, *args, **kwargs):
+            backend = open_backend(data_dir, *args, **kwargs)
+            close = backend.close
+
+            def close_and_record():
+                closed.append(data_dir.name)
+                close()
+
+            backend.close = close_and_record
+            return backend
+
+        manager = shards.ShardManager(root=self.root, shard_by="user", shard_dir=str(self.root_dir / "shards"), max_open=1)
+        self.addCleanup(manager.close)
+        with mock.patch.object(shards, "create_configured_backend", tracked_backend):
+            shard = manager.get("user-1")
+            shard.create("tasks", {"title": "Evicted"})
+            evicted = weakref.ref(shard)
+            del shard
+            manager.get("user-2")
+        gc.collect()
+
+        self.assertIsNone(evicted())
+        self.assertEqual(closed, ["user-1"])
+        self.assertEqual(manager.open_keys(), ["user-2"])
+        # The evicted shard's writes are on disk for the next load
+        reloaded = manager.get("user-1")
+        self.assertEqual([task["title"] for task in reloaded.get_all("tasks")], ["Evicted"])
+
+
+if __name__ == "__main__":
+    unittest.main()
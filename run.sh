@@ -62,30 +62,43 @@ if [ ! -d "frontend/node_modules" ]; then
 fi
 
 # 启动后端服务器
+# BACKEND_WORKERS>1 时以多进程模式启动（uvicorn --workers，无热重载），例如：
+#   BACKEND_WORKERS=4 ./run.sh
+BACKEND_WORKERS=${BACKEND_WORKERS:-1}
+if [ "$BACKEND_WORKERS" -gt 1 ]; then
+    # 多进程模式：写操作持有跨进程文件锁，写后/日志模式必须关闭
+    export CORETERRA_MULTIPROCESS=1
+    export CORETERRA_WRITE_BEHIND=0
+    export CORETERRA_JOURNAL=0
+    UVICORN_ARGS="--workers $BACKEND_WORKERS --port 8000"
+else
+    UVICORN_ARGS="--reload --port 8000"
+fi
+
 echo -e "\n${GREEN}启动后端服务器 (FastAPI)...${NC}"
 cd backend
 
 # 检测并使用 uv 或虚拟环境
 if command -v uv &> /dev/null; then
     echo -e "${BLUE}使用 uv 运行后端...${NC}"
-    uv run uvicorn app.main:app --reload --port 8000 > ../backend.log 2>&1 &
+    uv run uvicorn app.main:app $UVICORN_ARGS > ../backend.log 2>&1 &
     BACKEND_PID=$!
 elif [ -d "venv" ]; then
     source venv/bin/activate
-    uvicorn app.main:app --reload --port 8000 > ../backend.log 2>&1 &
+    uvicorn app.main:app $UVICORN_ARGS > ../backend.log 2>&1 &
     BACKEND_PID=$!
 elif [ -d ".venv" ]; then
     source .venv/bin/activate
-    uvicorn app.main:app --reload --port 8000 > ../backend.log 2>&1 &
+    uvicorn app.main:app $UVICORN_ARGS > ../backend.log 2>&1 &
     BACKEND_PID=$!
 else
     # 尝试直接运行（假设依赖已全局安装）
-    uvicorn app.main:app --reload --port 8000 > ../backend.log 2>&1 &
+    uvicorn app.main:app $UVICORN_ARGS > ../backend.log 2>&1 &
     BACKEND_PID=$!
 fi
 cd ..
 
-echo -e "${GREEN}后端服务器已启动 (PID: $BACKEND_PID)${NC}"
+echo -e "${GREEN}后端服务器已启动 (PID: $BACKEND_PID, workers: $BACKEND_WORKERS)${NC}"
 echo -e "  后端 API: ${BLUE}http://localhost:8000${NC}"
 echo -e "  API 文档: ${BLUE}http://localhost:8000/docs${NC}"
 